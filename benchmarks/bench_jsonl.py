@@ -0,0 +1,137 @@
+"""
+Benchmark decodifica JSONL: decoder e prefiltro a livello di byte
+
+Misura la velocità (MB/s) con cui iter_appended_records() legge una
+sessione intera con ogni decoder disponibile (json, orjson se installato),
+decodificando tutte le righe oppure solo quelle che passano un prefiltro:
+MESSAGE_PREFILTER (messaggi utente e assistente) o solo assistente.
+
+Senza argomenti genera una sessione sintetica realistica: risultati dei
+tool lunghi, snapshot dei file, messaggi brevi. Con --files si usano
+sessioni vere (es. ~/.claude/projects/*/*.jsonl).
+
+Uso:
+    python benchmarks/bench_jsonl.py [--mb 50] [--repeat 3] [--files F ...]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import claude_launcher_v6 as launcher
+
+WORDS = ("refactor", "migration", "schema", "test", "build", "deploy", "fix",
+         "index", "query", "cache", "thread", "widget", "render", "parse")
+
+
+def text(rng, n_words):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def make_record(rng, session_id, parent):
+    """Un record con la stessa forma (e circa le stesse proporzioni) di Claude Code"""
+    base = {
+        'parentUuid': parent,
+        'isSidechain': False,
+        'userType': 'external',
+        'cwd': '/home/bench/project',
+        'sessionId': session_id,
+        'version': '2.0.0',
+        'gitBranch': 'main',
+        'uuid': str(uuid.uuid4()),
+        'timestamp': '2025-01-31T10:20:30.000Z',
+    }
+    roll = rng.random()
+    if roll < 0.15:
+        base.update(type='user', message={'role': 'user', 'content': text(rng, 30)})
+    elif roll < 0.45:
+        base.update(type='assistant', message={
+            'id': f"msg_{uuid.uuid4().hex}", 'model': 'claude-sonnet-4', 'role': 'assistant',
+            'content': [{'type': 'text', 'text': text(rng, 80)}],
+            'usage': {'input_tokens': 1200, 'output_tokens': 300,
+                      'cache_read_input_tokens': 40000},
+        })
+    elif roll < 0.85:
+        # Risultato di un tool: il grosso dei byte di una sessione vera
+        output = "\n".join(text(rng, 12) for _ in range(rng.randint(20, 400)))
+        base.update(type='user', message={'role': 'user', 'content': [
+            {'type': 'tool_result', 'tool_use_id': f"toolu_{uuid.uuid4().hex}",
+             'content': output}
+        ]}, toolUseResult={'stdout': output, 'stderr': '', 'interrupted': False})
+    else:
+        base.update(type='file-history-snapshot', snapshot={
+            'trackedFileBackups': {f"src/file_{i}.py": {'backupFileName': uuid.uuid4().hex,
+                                                         'version': i}
+                                   for i in range(rng.randint(5, 60))},
+        })
+    return base
+
+
+def build_session(path, megabytes, rng):
+    session_id = str(uuid.uuid4())
+    parent = None
+    target = megabytes * 1024 * 1024
+    with open(path, 'w', encoding='utf-8') as f:
+        while f.tell() < target:
+            record = make_record(rng, session_id, parent)
+            parent = record['uuid']
+            f.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + "\n")
+
+
+def read_all(paths, prefilter):
+    """Ritorna il numero di record decodificati"""
+    records = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            for _ in launcher.iter_appended_records(f, 0, prefilter):
+                records += 1
+    return records
+
+
+def measure(paths, total_bytes, prefilter, repeat):
+    best = None
+    records = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = read_all(paths, prefilter)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return total_bytes / (1024 * 1024) / best, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--files", nargs="+")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.files:
+            paths = args.files
+        else:
+            paths = [os.path.join(tmp, "session.jsonl")]
+            build_session(paths[0], args.mb, random.Random(42))
+
+        total_bytes = sum(os.path.getsize(p) for p in paths)
+        print(f"{len(paths)} file, {total_bytes / (1024 * 1024):.1f} MB")
+        print(f"{'decoder':>8} {'prefiltro':>10} {'MB/s':>8} {'record':>8}")
+        for name in launcher.JSON_DECODERS:
+            launcher.set_json_decoder(name)
+            for label, prefilter in (("no", None),
+                                     ("messaggi", launcher.MESSAGE_PREFILTER),
+                                     ("assistant", launcher.type_prefilter("assistant"))):
+                speed, records = measure(paths, total_bytes, prefilter, args.repeat)
+                print(f"{name:>8} {label:>10} {speed:>8.1f} {records:>8}")
+
+
+if __name__ == "__main__":
+    main()
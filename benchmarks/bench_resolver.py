@@ -0,0 +1,92 @@
+"""
+Benchmark del resolver dei nomi codificati delle cartelle progetto
+
+Crea alberi profondi in una cartella temporanea, con nomi che si
+sovrappongono una volta codificati (es. "app-core", "app core", "app/core"),
+e misura ProjectPathResolver.resolve() a freddo (cache dei listing vuota)
+e a caldo, insieme al numero di scandir fatti.
+
+Solo POSIX: i nomi codificati in forma Windows (C--...) si risolvono
+solo su Windows.
+
+Uso:
+    python benchmarks/bench_resolver.py [--depths 4 8 16] [--fanout 4] [--targets 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import claude_launcher_v6 as launcher
+
+# Nomi che collidono una volta codificati: "app-core" == "app core" == "app/core"
+SEGMENTS = ["app", "core", "app-core", "app core", "my.lib", "my", "lib", "src_v2"]
+
+
+def build_tree(root, depth, fanout, rng):
+    """Crea un percorso principale profondo con rami laterali a ogni livello"""
+    current = root
+    spine = []
+    for _ in range(depth):
+        names = rng.sample(SEGMENTS, min(fanout, len(SEGMENTS)))
+        for name in names:
+            (current / name).mkdir(exist_ok=True)
+        current = current / names[0]
+        spine.append(current)
+    return spine
+
+
+def measure(resolver, names, clear_cache):
+    """Ritorna (ms medi per nome, scandir totali, nomi ambigui)"""
+    launcher.IO_COUNTERS.reset()
+    ambiguous = 0
+    start = time.perf_counter()
+    for name in names:
+        if clear_cache:
+            resolver.clear()
+        if len(resolver.resolve(name)) > 1:
+            ambiguous += 1
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / len(names), launcher.IO_COUNTERS.snapshot()['scandir'], ambiguous
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--depths", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--targets", type=int, default=50)
+    args = parser.parse_args()
+
+    if os.sep != '/':
+        print("Questo benchmark usa la codifica POSIX: eseguirlo su Linux/macOS")
+        return
+
+    rng = random.Random(42)
+    print(f"{'profondità':>10} {'freddo ms':>10} {'scandir':>8} {'caldo ms':>9} {'ambigui':>8}")
+    for depth in args.depths:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            targets = []
+            for _ in range(args.targets):
+                spine = build_tree(root, depth, args.fanout, rng)
+                targets.append(str(spine[-1]))
+            names = [launcher.encode_project_path(path) for path in targets]
+
+            resolver = launcher.ProjectPathResolver()
+            cold_ms, cold_scans, ambiguous = measure(resolver, names, clear_cache=True)
+            resolver.clear()
+            measure(resolver, names, clear_cache=False)
+            warm_ms, _, _ = measure(resolver, names, clear_cache=False)
+
+            print(f"{depth:>10} {cold_ms:>10.3f} {cold_scans // len(names):>8} "
+                  f"{warm_ms:>9.3f} {ambiguous:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark scansione progetti: seriale vs parallela
+
+Crea un albero sintetico di ~/.claude/projects in una cartella temporanea
+e misura list_projects() a freddo (senza indice) con 1, 4 e 16 worker.
+
+Con --latency-ms si simula il costo di ogni apertura file tipico di home
+di rete o antivirus (default 2 ms): su disco locale veloce il guadagno è
+limitato dal GIL, su filesystem lenti è proprio la latenza che si nasconde.
+
+Uso:
+    python benchmarks/bench_scan.py [--projects 200] [--sessions 20]
+                                    [--latency-ms 2] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import claude_launcher_v6 as launcher
+
+
+def build_tree(root, n_projects, n_sessions):
+    """Crea n_projects cartelle con n_sessions file .jsonl ciascuna"""
+    for p in range(n_projects):
+        folder = root / f"C--Users-bench-project-{p}"
+        folder.mkdir(parents=True)
+        for s in range(n_sessions):
+            session_id = str(uuid.uuid4())
+            with open(folder / f"{session_id}.jsonl", 'w', encoding='utf-8') as f:
+                for i in range(20):
+                    f.write(json.dumps({
+                        'type': 'user',
+                        'sessionId': session_id,
+                        'message': f"messaggio {i} della sessione {s} progetto {p}",
+                    }) + "\n")
+
+
+def run(workers, repeat):
+    """Ritorna il tempo migliore di list_projects() a freddo"""
+    best = None
+    for _ in range(repeat):
+        # A freddo: i riassunti in memoria del giro precedente non valgono
+        launcher._summary_cache.clear()
+        start = time.perf_counter()
+        projects = launcher.list_projects(use_index=False, workers=workers,
+                                          with_sessions=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, projects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "projects"
+        build_tree(root, args.projects, args.sessions)
+
+        launcher.get_claude_projects_dir = lambda: root
+        # Indice, mapping e cache negativa nella cartella temporanea, mai
+        # accanto al launcher; nessun probe su disco reale
+        launcher.get_app_dir = lambda: Path(tmp)
+        launcher.resolve_project_path = lambda folder_name, files=None: (
+            launcher.naive_decode_path(folder_name), [], False)
+
+        if args.latency_ms > 0:
+            # Tutte le letture delle sessioni passano da open_session
+            open_session = launcher.open_session
+
+            def slow_open(path):
+                time.sleep(args.latency_ms / 1000)
+                return open_session(path)
+
+            launcher.open_session = slow_open
+
+        total = args.projects * args.sessions
+        print(f"Albero sintetico: {args.projects} progetti, {total} sessioni, "
+              f"latenza simulata {args.latency_ms} ms/file")
+
+        baseline = None
+        reference = None
+        for workers in (1, 4, 16):
+            elapsed, projects = run(workers, args.repeat)
+            order = [p['folder_name'] for p in projects]
+            if reference is None:
+                reference = order
+            elif order != reference:
+                print(f"  ATTENZIONE: ordine diverso con {workers} worker")
+            baseline = baseline or elapsed
+            print(f"  {workers:>2} worker: {elapsed * 1000:8.1f} ms  "
+                  f"(speedup x{baseline / elapsed:.2f})")
+
+
+if __name__ == "__main__":
+    main()
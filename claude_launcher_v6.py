@@ -12,21 +12,180 @@ Claude Code Launcher v8
 
 import os
 import sys
+import time
+
+# ============================================================
+#                    PROFILO DEGLI IMPORT
+# ============================================================
+
+# Istante di avvio, per il tempo fino alla finestra
+STARTED_AT = time.perf_counter()
+# Budget del tempo di avvio (fino alla finestra disegnata) in ms
+try:
+    STARTUP_BUDGET_MS = int(os.environ.get("CLAUDE_LAUNCHER_STARTUP_BUDGET_MS", "1500"))
+except ValueError:
+    STARTUP_BUDGET_MS = 1500
+
+class ImportTimer:
+    """
+    Misura il tempo di ogni import, come python -X importtime
+
+    Si attiva con CLAUDE_LAUNCHER_IMPORTTIME=1 (report su stderr) oppure
+    =<file> (report accodato al file: l'exe PyInstaller non ha stderr e
+    non accetta -X). Si installa in testa a sys.meta_path prima degli
+    altri import; per ogni modulo caricato registra il tempo proprio e
+    cumulativo (inclusi i moduli importati da lui).
+    """
+
+    def __init__(self):
+        self.records = []
+        self.stack = []
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, self, name)
+        return spec
+
+    def report(self, window_ms=None):
+        lines = ["import time: self [us] | cumulative | imported package"]
+        for name, own, total, depth in self.records:
+            lines.append(f"import time: {own * 1e6:9.0f} | {total * 1e6:10.0f} | {'  ' * depth}{name}")
+        if window_ms is not None:
+            verdict = "OK" if window_ms <= STARTUP_BUDGET_MS else "OLTRE IL BUDGET"
+            lines.append(f"finestra pronta in {window_ms:.0f} ms "
+                         f"(budget {STARTUP_BUDGET_MS} ms): {verdict}")
+        return "\n".join(lines)
+
+class _TimedLoader:
+    """
+    Loader che delega a quello vero cronometrando create_module ed
+    exec_module (le estensioni C si caricano già in create_module)
+    """
+
+    def __init__(self, loader, timer, name):
+        self._loader = loader
+        self._timer = timer
+        self._name = name
+        self._start = None
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        self._timer.stack.append(0.0)
+        self._start = time.perf_counter()
+        try:
+            return self._loader.create_module(spec)
+        except BaseException:
+            self._timer.stack.pop()
+            raise
+
+    def exec_module(self, module):
+        stack = self._timer.stack
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - self._start
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            self._timer.records.append((self._name, total - children, total, len(stack)))
+
+IMPORT_TIMER = None
+if os.environ.get("CLAUDE_LAUNCHER_IMPORTTIME"):
+    IMPORT_TIMER = ImportTimer()
+    sys.meta_path.insert(0, IMPORT_TIMER)
+
+def report_startup():
+    """Scrive il profilo degli import e il tempo fino alla finestra (se attivo)"""
+    if IMPORT_TIMER is None:
+        return
+    text = IMPORT_TIMER.report((time.perf_counter() - STARTED_AT) * 1000)
+    target = os.environ.get("CLAUDE_LAUNCHER_IMPORTTIME")
+    try:
+        if target == "1":
+            if sys.stderr:
+                print(text, file=sys.stderr)
+        else:
+            with open(target, 'a', encoding='utf-8') as f:
+                f.write(text + "\n")
+    except OSError:
+        pass
+
+import argparse
 import json
 import subprocess
 import re
-import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog, filedialog
+import sqlite3
+import threading
+import queue
+import select
+import struct
+import bisect
+import ctypes
+import ctypes.util
+import hashlib
+import mmap
+import gzip
+import zlib
+import io
+import shutil
 from pathlib import Path
 from datetime import datetime
+from collections import deque
+from abc import ABC, abstractmethod
+from array import array
 import tempfile
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# Decoder JSON più veloce (opzionale)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# Per clipboard immagini
+# Compressione zstd per l'archivio sessioni (opzionale, altrimenti gzip)
 try:
-    from PIL import Image, ImageTk, ImageGrab
-    PIL_AVAILABLE = True
+    import zstandard
 except ImportError:
-    PIL_AVAILABLE = False
+    zstandard = None
+
+# tkinter serve solo alla GUI: i sottocomandi da riga di comando non lo
+# importano mai (vedi load_tk, chiamata da ClaudeLauncherGUI)
+tk = ttk = messagebox = simpledialog = filedialog = None
+
+def load_tk():
+    """Importa tkinter nei nomi globali usati dalla GUI"""
+    global tk, ttk, messagebox, simpledialog, filedialog
+    import tkinter as tk
+    from tkinter import ttk, messagebox, simpledialog, filedialog
+
+# Per clipboard immagini: Pillow pesa sull'avvio e serve solo per gli
+# screenshot, quindi qui si controlla solo che ci sia (vedi load_pil)
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+_pil_modules = None
+
+def load_pil():
+    """Importa Pillow al primo screenshot; ritorna (Image, ImageTk, ImageGrab)"""
+    global _pil_modules, PIL_AVAILABLE
+    if _pil_modules is None:
+        try:
+            from PIL import Image, ImageTk, ImageGrab
+        except ImportError:
+            PIL_AVAILABLE = False
+            return None
+        _pil_modules = (Image, ImageTk, ImageGrab)
+    return _pil_modules
 
 
 # ============================================================
@@ -229,225 +388,3101 @@ goto loop
 #                    FUNZIONI PROGETTI
 # ============================================================
 
+# Thread usati da list_projects() per la scansione parallela.
+# Su home di rete o con antivirus ogni stat/open costa millisecondi:
+# la scansione parallela nasconde la latenza. Override con la variabile
+# d'ambiente CLAUDE_LAUNCHER_SCAN_WORKERS (1 = seriale).
+try:
+    SCAN_WORKERS = max(1, int(os.environ.get("CLAUDE_LAUNCHER_SCAN_WORKERS", "8")))
+except ValueError:
+    SCAN_WORKERS = 8
+
+# Con CLAUDE_LAUNCHER_IO_STATS=1 la barra di stato mostra i contatori di I/O
+SHOW_IO_STATS = os.environ.get("CLAUDE_LAUNCHER_IO_STATS", "") not in ("", "0")
+
+# Su Windows DirEntry.stat() usa i dati già restituiti dall'enumerazione
+# della cartella, su POSIX costa una chiamata stat (poi memorizzata)
+SCANDIR_STAT_IS_FREE = sys.platform == 'win32'
+
+
+class IOCounters:
+    """
+    Contatori delle operazioni su disco fatte durante un refresh.
+
+    Servono a verificare che un refresh a regime (nessun file cambiato)
+    faccia quasi zero aperture di file.
+    """
+
+    FIELDS = ('scandir', 'stat', 'open', 'read')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+
+    def reset(self):
+        with self.lock:
+            self.counts = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, name, n=1):
+        with self.lock:
+            self.counts[name] += n
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def __str__(self):
+        counts = self.snapshot()
+        return " ".join(f"{name}={counts[name]}" for name in self.FIELDS)
+
+
+IO_COUNTERS = IOCounters()
+
+# Decoder JSON disponibili: nome -> funzione che accetta bytes o str
+JSON_DECODERS = {"json": json.loads}
+if orjson is not None:
+    JSON_DECODERS["orjson"] = orjson.loads
+
+# CLAUDE_LAUNCHER_JSON=json forza il decoder della libreria standard
+JSON_DECODER = os.environ.get("CLAUDE_LAUNCHER_JSON", "")
+if JSON_DECODER not in JSON_DECODERS:
+    JSON_DECODER = "orjson" if orjson is not None else "json"
+_json_loads = JSON_DECODERS[JSON_DECODER]
+
+def set_json_decoder(name):
+    """Sceglie il decoder usato da decode_jsonl_line (tra JSON_DECODERS)"""
+    global JSON_DECODER, _json_loads
+    _json_loads = JSON_DECODERS[name]
+    JSON_DECODER = name
+
+def decode_jsonl_line(line):
+    """
+    Decodifica una riga JSONL (bytes o str) con il decoder scelto
+
+    Solleva ValueError se la riga non è JSON valido.
+    """
+    return _json_loads(line)
+
+def type_prefilter(*types):
+    """
+    Pattern di byte che una riga deve contenere per essere di uno dei tipi indicati
+
+    Le righe che non ne contengono nessuno si possono saltare senza
+    decodificarle; quelle che passano vanno comunque controllate dopo.
+    """
+    patterns = []
+    for kind in types:
+        kind = kind.encode()
+        patterns.append(b'"type":"' + kind + b'"')
+        patterns.append(b'"type": "' + kind + b'"')
+    return tuple(patterns)
+
+# Solo i messaggi della conversazione (metadati, ricerca, anteprime)
+MESSAGE_PREFILTER = type_prefilter("user", "assistant")
+USER_PREFILTER = type_prefilter("user")
+
 def get_claude_projects_dir():
     """Trova la cartella dei progetti Claude"""
     home = Path.home()
     claude_dir = home / ".claude" / "projects"
     return claude_dir
 
+def get_app_dir():
+    """Cartella dell'applicazione (accanto all'exe o allo script)"""
+    if getattr(sys, 'frozen', False):
+        return Path(sys.executable).parent
+    return Path(__file__).parent
+
 def get_config_path():
     """Percorso file config per salvare i mapping dei percorsi"""
-    if getattr(sys, 'frozen', False):
-        base_path = Path(sys.executable).parent
-    else:
-        base_path = Path(__file__).parent
-    return base_path / "claude_paths_config.json"
+    return get_app_dir() / "claude_paths_config.json"
+
+def get_index_path():
+    """Percorso del database con l'indice delle sessioni"""
+    return get_app_dir() / "claude_sessions_index.db"
+
+def get_snapshot_path():
+    """Percorso dell'ultimo elenco progetti mostrato (per l'avvio immediato)"""
+    return get_app_dir() / "claude_projects_snapshot.json"
+
+class PathMappingStore:
+    """
+    Mapping nome cartella -> percorso reale, servito dalla memoria.
+
+    claude_paths_config.json viene letto una volta e riletto solo quando il
+    suo mtime su disco cambia. I nuovi mapping si accumulano in memoria e
+    vengono scritti tutti insieme con flush(), con una scrittura atomica
+    (file temporaneo + os.replace).
+    """
+
+    def __init__(self, config_path=None):
+        self.config_path = Path(config_path or get_config_path())
+        self.lock = threading.RLock()
+        self.mappings = {}
+        self.pending = {}
+        self.loaded = False
+        self.loaded_mtime = None
+
+    def _file_mtime(self):
+        IO_COUNTERS.add('stat')
+        try:
+            return os.stat(self.config_path).st_mtime
+        except OSError:
+            return None
+
+    def reload_if_changed(self):
+        """Rilegge il file se è cambiato su disco (un solo stat se invariato)"""
+        with self.lock:
+            mtime = self._file_mtime()
+            if self.loaded and mtime == self.loaded_mtime:
+                return
+            mappings = {}
+            if mtime is not None:
+                try:
+                    IO_COUNTERS.add('open')
+                    IO_COUNTERS.add('read')
+                    with open(self.config_path, 'r', encoding='utf-8') as f:
+                        mappings = json.load(f)
+                except:
+                    pass
+            # I mapping non ancora scritti restano validi
+            mappings.update(self.pending)
+            self.mappings = mappings
+            self.loaded = True
+            self.loaded_mtime = mtime
+
+    def get(self, folder_name):
+        with self.lock:
+            if not self.loaded:
+                self.reload_if_changed()
+            return self.mappings.get(folder_name)
+
+    def all(self):
+        with self.lock:
+            if not self.loaded:
+                self.reload_if_changed()
+            return dict(self.mappings)
+
+    def set(self, folder_name, real_path):
+        """Registra un mapping; su disco finisce al prossimo flush()"""
+        with self.lock:
+            if not self.loaded:
+                self.reload_if_changed()
+            if self.mappings.get(folder_name) == real_path:
+                return
+            self.mappings[folder_name] = real_path
+            self.pending[folder_name] = real_path
+
+    def flush(self):
+        """Scrive i mapping in sospeso con un'unica scrittura atomica"""
+        with self.lock:
+            if not self.pending:
+                return
+            # Non perdere modifiche fatte al file da un'altra istanza
+            self.reload_if_changed()
+            tmp_path = None
+            try:
+                fd, tmp_path = tempfile.mkstemp(
+                    prefix=".claude_paths_", suffix=".tmp", dir=str(self.config_path.parent)
+                )
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self.mappings, f, indent=2)
+                os.replace(tmp_path, self.config_path)
+                tmp_path = None
+                self.pending.clear()
+                self.loaded_mtime = self._file_mtime()
+            except OSError:
+                pass
+            finally:
+                if tmp_path:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+
+_path_mapping_store = None
+
+def get_path_mapping_store():
+    """Ritorna lo store dei mapping condiviso"""
+    global _path_mapping_store
+    if _path_mapping_store is None:
+        _path_mapping_store = PathMappingStore()
+    return _path_mapping_store
 
 def load_path_mappings():
     """Carica i mapping salvati tra nome cartella e percorso reale"""
-    config_path = get_config_path()
-    if config_path.exists():
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            pass
-    return {}
+    return get_path_mapping_store().all()
 
 def save_path_mapping(folder_name, real_path):
-    """Salva un mapping tra nome cartella e percorso reale"""
-    mappings = load_path_mappings()
-    mappings[folder_name] = real_path
+    """Salva subito un mapping tra nome cartella e percorso reale"""
+    store = get_path_mapping_store()
+    store.set(folder_name, real_path)
+    store.flush()
+
+# Percorsi non risolvibili (drive scollegati, share di rete spente, VM
+# rimosse): non vengono riprovati prima di UNRESOLVED_TTL secondi
+UNRESOLVED_TTL = 30 * 60
+
+# Tempo massimo per ogni accesso al disco del resolver (0 = nessun limite).
+# Un isdir/scandir su una share di rete morta può bloccare per secondi:
+# il probe gira in un thread a parte e dopo il timeout si rinuncia.
+try:
+    PROBE_TIMEOUT = float(os.environ.get("CLAUDE_LAUNCHER_PROBE_TIMEOUT", "2"))
+except ValueError:
+    PROBE_TIMEOUT = 2.0
+
+
+class ProbeTimeout(Exception):
+    """Un accesso al disco non ha risposto entro PROBE_TIMEOUT"""
+
+
+_probe_pool = None
+_probe_pool_lock = threading.Lock()
+
+def submit_probe(func, *args):
+    """
+    Avvia un accesso al disco nel pool dei probe, ritorna il Future
+
+    Il probe gira in un pool dedicato: se non risponde in tempo il thread
+    bloccato resta nel pool senza fermare chi aspetta (vedi wait_probe).
+    """
+    global _probe_pool
+    with _probe_pool_lock:
+        if _probe_pool is None:
+            _probe_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="probe")
+    return _probe_pool.submit(func, *args)
+
+def wait_probe(future, what=""):
+    """Attende un probe per al massimo PROBE_TIMEOUT, poi solleva ProbeTimeout"""
     try:
-        with open(get_config_path(), 'w', encoding='utf-8') as f:
-            json.dump(mappings, f, indent=2)
-    except:
-        pass
+        return future.result(timeout=PROBE_TIMEOUT)
+    except FutureTimeoutError:
+        raise ProbeTimeout(f"nessuna risposta da {what}")
 
-def decode_project_path(folder_name):
-    """Decodifica il nome della cartella nel percorso originale."""
-    mappings = load_path_mappings()
-    if folder_name in mappings:
-        return mappings[folder_name]
-    
+
+class UnresolvedPathCache:
+    """
+    Cache negativa delle cartelle progetto il cui percorso non esiste.
+
+    Finché una voce è più recente di UNRESOLVED_TTL la cartella non viene
+    riprovata; retry() la fa riprovare subito. Le voci sono salvate nel
+    SessionIndex, quindi valgono anche al riavvio.
+    """
+
+    def __init__(self, index=None, ttl=UNRESOLVED_TTL):
+        self.index = index
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = None
+
+    def _load(self):
+        if self.entries is None:
+            self.entries = self.index.get_unresolved() if self.index else {}
+
+    def is_fresh(self, folder_name):
+        with self.lock:
+            self._load()
+            checked_at = self.entries.get(folder_name)
+        return checked_at is not None and time.time() - checked_at < self.ttl
+
+    def add(self, folder_name):
+        now = time.time()
+        with self.lock:
+            self._load()
+            self.entries[folder_name] = now
+        if self.index:
+            self.index.mark_unresolved(folder_name, now)
+
+    def retry(self, folder_name=None):
+        """Dimentica una cartella (o tutte, con None) così viene riprovata subito"""
+        with _path_misses_lock:
+            if folder_name is None:
+                _path_misses.clear()
+            else:
+                _path_misses.pop(folder_name, None)
+        with self.lock:
+            self._load()
+            if folder_name is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(folder_name, None)
+        if self.index:
+            self.index.clear_unresolved(folder_name)
+
+    def folders(self):
+        with self.lock:
+            self._load()
+            return list(self.entries)
+
+
+_unresolved_cache = None
+
+def get_unresolved_cache():
+    """Ritorna la cache negativa condivisa (salvata nell'indice sessioni)"""
+    global _unresolved_cache
+    if _unresolved_cache is None:
+        _unresolved_cache = UnresolvedPathCache(get_session_index())
+    return _unresolved_cache
+
+def encode_project_path(path):
+    """Codifica un percorso come fa Claude Code per i nomi delle cartelle"""
+    return re.sub(r'[^A-Za-z0-9]', '-', path)
+
+
+class ProjectPathResolver:
+    """
+    Risolve i nomi codificati delle cartelle progetto nel percorso reale.
+
+    Claude Code sostituisce con '-' ogni carattere non alfanumerico, quindi
+    separatori, spazi, trattini e punti diventano indistinguibili. Invece
+    di provare a caso le combinazioni con isdir, il resolver scende dalla
+    radice: a ogni livello confronta i nomi codificati delle sottocartelle
+    (listing in cache) con il resto del nome, memorizzando le ricerche già
+    fatte. Supporta la forma Windows (C--Users-...) e POSIX (-home-...).
+    """
+
+    # Basta sapere se esiste più di una soluzione
+    MAX_CANDIDATES = 2
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # {cartella: [(nome codificato, nome)]} delle sole sottocartelle
+        self.listings = {}
+        # Cartelle che non hanno risposto entro PROBE_TIMEOUT in questa scansione
+        self.dead = set()
+        # Probe in corso: più thread che chiedono la stessa cartella aspettano
+        # lo stesso probe invece di bloccare un thread del pool ciascuno
+        self.inflight = {}
+
+    def clear(self):
+        """Svuota la cache dei listing (a inizio scansione)"""
+        with self.lock:
+            self.listings = {}
+            self.dead = set()
+
+    def _is_dead(self, directory):
+        with self.lock:
+            return any(directory == dead or directory.startswith(dead.rstrip(os.sep) + os.sep)
+                       for dead in self.dead)
+
+    def _subdirs(self, directory):
+        with self.lock:
+            cached = self.listings.get(directory)
+        if cached is not None:
+            return cached
+        # Una share morta costa al massimo un timeout per scansione
+        if self._is_dead(directory):
+            raise ProbeTimeout(directory)
+        if PROBE_TIMEOUT <= 0:
+            subdirs = self._list_subdirs(directory)
+        else:
+            with self.lock:
+                future = self.inflight.get(directory)
+                if future is None:
+                    future = submit_probe(self._list_subdirs, directory)
+                    self.inflight[directory] = future
+            try:
+                subdirs = wait_probe(future, directory)
+            except ProbeTimeout:
+                with self.lock:
+                    self.dead.add(directory)
+                raise
+            finally:
+                if future.done():
+                    with self.lock:
+                        if self.inflight.get(directory) is future:
+                            del self.inflight[directory]
+        with self.lock:
+            self.listings[directory] = subdirs
+        return subdirs
+
+    @staticmethod
+    def _list_subdirs(directory):
+        subdirs = []
+        IO_COUNTERS.add('scandir')
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            subdirs.append((encode_project_path(entry.name), entry.name))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return subdirs
+
+    @staticmethod
+    def split_root(folder_name):
+        """Ritorna (radice, resto codificato) o None se il nome non è riconosciuto"""
+        match = re.match(r'^([A-Za-z])--(.*)$', folder_name)
+        if match:
+            if sys.platform != 'win32':
+                return None
+            return (f"{match.group(1).upper()}:\\", match.group(2))
+        if folder_name.startswith('-') and os.sep == '/':
+            return ('/', folder_name[1:])
+        return None
+
+    def resolve(self, folder_name):
+        """
+        Ritorna i percorsi esistenti che corrispondono (0, 1 o più = ambiguo)
+
+        Solleva ProbeTimeout se una cartella lungo il percorso non risponde.
+        """
+        split = self.split_root(folder_name)
+        if not split:
+            return []
+        root, encoded = split
+        if not encoded:
+            return [root]
+
+        memo = {}
+
+        def search(directory, offset):
+            key = (directory, offset)
+            if key in memo:
+                return memo[key]
+            if offset == len(encoded):
+                memo[key] = [directory]
+                return memo[key]
+            found = []
+            for enc_name, name in self._subdirs(directory):
+                end = offset + len(enc_name)
+                if not encoded.startswith(enc_name, offset):
+                    continue
+                if end == len(encoded):
+                    next_offset = end
+                elif encoded[end] == '-':
+                    next_offset = end + 1
+                else:
+                    continue
+                for path in search(os.path.join(directory, name), next_offset):
+                    found.append(path)
+                    if len(found) >= self.MAX_CANDIDATES:
+                        break
+                if len(found) >= self.MAX_CANDIDATES:
+                    break
+            memo[key] = found
+            return found
+
+        return search(root, 0)
+
+
+_path_resolver = None
+
+def get_path_resolver():
+    """Ritorna il resolver condiviso (listing in cache tra le chiamate)"""
+    global _path_resolver
+    if _path_resolver is None:
+        _path_resolver = ProjectPathResolver()
+    return _path_resolver
+
+def naive_decode_path(folder_name):
+    """Decodifica 'a occhio' (ogni '-' è un separatore), senza accedere al disco"""
     match = re.match(r'^([A-Za-z])--(.+)$', folder_name)
-    if not match:
+    if match:
+        return f"{match.group(1).upper()}:\\" + match.group(2).replace('-', '\\')
+    if folder_name.startswith('-'):
+        return folder_name.replace('-', '/')
+    return None
+
+# Byte letti dall'inizio di una sessione per trovare il campo cwd
+CWD_SCAN_BYTES = 64 * 1024
+
+def read_session_cwd(jsonl_path, max_bytes=CWD_SCAN_BYTES):
+    """
+    Ritorna la cartella di lavoro (campo cwd) del primo record che la contiene
+
+    Legge al massimo max_bytes dall'inizio del file; None se non la trova.
+    """
+    try:
+        IO_COUNTERS.add('open')
+        with open_session(jsonl_path) as f:
+            IO_COUNTERS.add('read')
+            data = f.read(max_bytes)
+            at_eof = len(data) < max_bytes
+    except SESSION_READ_ERRORS:
         return None
     
-    drive = match.group(1).upper()
-    rest = match.group(2)
+    lines = data.split(b"\n")
+    if not at_eof:
+        # L'ultima riga può essere tagliata a metà
+        lines = lines[:-1]
+    for line in lines:
+        if b'"cwd"' not in line:
+            continue
+        try:
+            record = decode_jsonl_line(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict):
+            cwd = record.get('cwd')
+            if isinstance(cwd, str) and cwd:
+                return cwd
+    return None
+
+# Cartelle la cui sessione più recente non dà il percorso:
+# {cartella: (firma della cartella, candidati ambigui del resolver o None)}.
+# Finché la firma non cambia il file non si riapre e i probe non si ripetono.
+_path_misses = {}
+_path_misses_lock = threading.Lock()
+
+def resolve_project_path(folder_name, files=None):
+    """
+    Risolve il percorso reale di una cartella progetto
+
+    Ritorna (percorso, candidati, non_risolto). Prima si cerca il campo cwd
+    nella sessione più recente (files è l'elenco di scan_session_files):
+    è il percorso esatto e non richiede probe sul disco. Altrimenti si
+    usa il resolver: con una sola corrispondenza su disco il percorso viene
+    registrato nello store dei mapping; se le corrispondenze sono più di
+    una il percorso è None e i candidati vanno fatti scegliere all'utente.
+    Se non ce ne sono, o il disco non risponde, la cartella entra nella
+    cache negativa e resta la decodifica ingenua. L'esito negativo del cwd
+    e i candidati ambigui restano in _path_misses per la firma della cartella.
+    """
+    store = get_path_mapping_store()
+    mapped = store.get(folder_name)
+    if mapped:
+        return mapped, [], False
     
-    path_attempt = f"{drive}:\\" + rest.replace('-', '\\')
+    signature = folder_signature(files) if files else None
+    with _path_misses_lock:
+        miss = _path_misses.get(folder_name)
+    if not signature or not miss or miss[0] != signature:
+        miss = None
     
-    if os.path.isdir(path_attempt):
-        save_path_mapping(folder_name, path_attempt)
-        return path_attempt
+    if files and not miss:
+        newest = max(files, key=lambda f: f[1])
+        cwd = read_session_cwd(newest[0])
+        # Una sessione che ha cambiato cartella non descrive il progetto
+        if cwd and encode_project_path(cwd) == folder_name:
+            store.set(folder_name, cwd)
+            return cwd, [], False
+        miss = (signature, None)
+        with _path_misses_lock:
+            _path_misses[folder_name] = miss
+    if miss and miss[1]:
+        return None, miss[1], False
     
-    parts = rest.split('-')
+    unresolved = get_unresolved_cache()
+    if unresolved.is_fresh(folder_name):
+        return naive_decode_path(folder_name), [], True
     
-    for i in range(len(parts)):
-        if i == 0:
-            test_path = f"{drive}:\\" + ' '.join(parts)
-        else:
-            test_path = f"{drive}:\\" + '\\'.join(parts[:i]) + '\\' + ' '.join(parts[i:])
-        
-        if os.path.isdir(test_path):
-            save_path_mapping(folder_name, test_path)
-            return test_path
+    try:
+        candidates = get_path_resolver().resolve(folder_name)
+    except ProbeTimeout:
+        candidates = []
+    if len(candidates) == 1:
+        store.set(folder_name, candidates[0])
+        return candidates[0], [], False
+    if candidates:
+        if signature:
+            with _path_misses_lock:
+                _path_misses[folder_name] = (signature, candidates)
+        return None, candidates, False
     
-    return f"{drive}:\\" + rest.replace('-', '\\')
+    unresolved.add(folder_name)
+    return naive_decode_path(folder_name), [], True
+
+def decode_project_path(folder_name):
+    """
+    Decodifica il nome della cartella nel percorso originale.
+
+    I percorsi trovati vengono registrati nello store dei mapping e
+    scritti su disco al flush() di fine scansione. Ritorna None se il
+    nome è ambiguo (vedi resolve_project_path).
+    """
+    return resolve_project_path(folder_name)[0]
 
 def read_jsonl_first_line(filepath):
     """Legge la prima riga di un file JSONL"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
+        IO_COUNTERS.add('open')
+        with open_session(filepath) as f:
+            IO_COUNTERS.add('read')
             first_line = f.readline().strip()
             if first_line:
-                return json.loads(first_line)
+                return decode_jsonl_line(first_line)
     except:
         pass
     return None
 
-def get_session_summary(jsonl_path):
-    """Estrae un riassunto dalla sessione"""
-    data = read_jsonl_first_line(jsonl_path)
-    if data:
-        if isinstance(data, dict):
-            if 'message' in data:
-                msg = data['message']
-                if isinstance(msg, str):
-                    return msg[:50] + "..." if len(msg) > 50 else msg
-            if 'content' in data:
-                content = data['content']
-                if isinstance(content, str):
-                    return content[:50] + "..." if len(content) > 50 else content
-    return None
+# Byte massimi letti dalla fine di una sessione per le ultime righe
+TAIL_MAX_BYTES = 1024 * 1024
+# Blocco letto a ritroso quando il file non si può mappare in memoria
+TAIL_BLOCK_BYTES = 64 * 1024
 
-def get_project_info(project_dir):
-    """Estrae informazioni sul progetto"""
-    info = {
-        'sessions': [],
-        'last_modified': None,
-    }
-    
-    jsonl_files = [f for f in project_dir.glob("*.jsonl") if f.is_file()]
-    
-    for jf in jsonl_files:
-        session_info = {
-            'id': jf.stem,
-            'path': jf,
-            'modified': datetime.fromtimestamp(jf.stat().st_mtime),
-            'size': jf.stat().st_size,
-            'summary': get_session_summary(jf)
-        }
-        info['sessions'].append(session_info)
-    
-    info['sessions'].sort(key=lambda x: x['modified'], reverse=True)
-    
-    if info['sessions']:
-        info['last_modified'] = info['sessions'][0]['modified']
-    
-    return info
+def _tail_lines(buf, lo, n, truncated):
+    """
+    Ultime n righe complete di buf (bytes o mmap) cercando da lo in poi
 
-def list_projects():
-    """Lista tutti i progetti con sessioni"""
-    projects_dir = get_claude_projects_dir()
+    Se truncated, prima di lo ci sono altri dati: la riga che inizia
+    prima di lo è incompleta e viene scartata.
+    Ritorna le righe dalla più recente.
+    """
+    lines = []
+    end = buf.rfind(b"\n", lo)
+    while end > lo and len(lines) < n:
+        start = buf.rfind(b"\n", lo, end)
+        if start == -1:
+            if truncated:
+                break
+            start = lo - 1
+        line = buf[start + 1:end]
+        if line.strip():
+            lines.append(line)
+        end = start
+    return lines
+
+def read_jsonl_tail(filepath, n=20, max_bytes=TAIL_MAX_BYTES):
+    """
+    Legge gli ultimi n record completi di un file JSONL
+
+    Usa il memory mapping e cerca i newline a ritroso dalla fine, quindi
+    il costo dipende solo dai byte in coda, non dalla dimensione del file.
+    Se il mapping non è possibile legge la coda a blocchi con seek.
+    Si fermano a max_bytes dalla fine; la riga finale senza newline
+    (ancora in scrittura) viene ignorata. Ritorna i record dal più vecchio.
+    Le sessioni archiviate vanno decompresse dall'inizio (costo lineare).
+    """
+    if is_archived_session(filepath):
+        try:
+            IO_COUNTERS.add('open')
+            with open_session(filepath) as f:
+                IO_COUNTERS.add('read')
+                lines = list(reversed(deque(
+                    (line for line in f if line.strip()), maxlen=n
+                )))
+        except SESSION_READ_ERRORS:
+            return []
+        return _decode_tail(lines)
     
-    if not projects_dir.exists():
+    try:
+        IO_COUNTERS.add('open')
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return []
+            base = max(0, size - max_bytes)
+            IO_COUNTERS.add('read')
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    lines = _tail_lines(mm, base, n, base > 0)
+            except (ValueError, OSError):
+                buf = b""
+                pos = size
+                newlines = 0
+                while pos > base and newlines <= n:
+                    step = min(TAIL_BLOCK_BYTES, pos - base)
+                    pos -= step
+                    f.seek(pos)
+                    block = f.read(step)
+                    newlines += block.count(b"\n")
+                    buf = block + buf
+                lines = _tail_lines(buf, 0, n, pos > 0)
+    except OSError:
         return []
-    
-    projects = []
-    
-    for folder in projects_dir.iterdir():
-        if folder.is_dir():
-            info = get_project_info(folder)
-            
-            if not info['sessions']:
-                continue
-            
-            real_path = decode_project_path(folder.name)
-            
-            projects.append({
-                'folder_name': folder.name,
-                'folder_path': folder,
-                'real_path': real_path,
-                'sessions': info['sessions'],
-                'session_count': len(info['sessions']),
-                'last_modified': info['last_modified']
-            })
-    
-    projects.sort(key=lambda x: x['last_modified'] or datetime.min, reverse=True)
-    
-    return projects
+    return _decode_tail(lines)
 
-def format_size(size_bytes):
-    """Formatta dimensione file"""
-    if size_bytes < 1024:
-        return f"{size_bytes} B"
-    elif size_bytes < 1024 * 1024:
-        return f"{size_bytes // 1024} KB"
-    else:
-        return f"{size_bytes // (1024*1024)} MB"
+def _decode_tail(lines):
+    """Decodifica le righe lette dalla coda (dalla più recente) in ordine cronologico"""
+    records = []
+    for line in reversed(lines):
+        try:
+            records.append(decode_jsonl_line(line))
+        except ValueError:
+            continue
+    return records
 
-def launch_claude_terminal(project_path, session_id=None, new_session=False, as_new_tab=False):
+def scan_session_files(project_dir):
     """
-    Lancia Claude in Windows Terminal
+    Elenca i file .jsonl di un progetto con una sola enumerazione
 
-    Args:
-        project_path: percorso del progetto
-        session_id: ID specifico della sessione (opzionale)
-        new_session: se True, avvia una NUOVA sessione (senza --resume)
-        as_new_tab: se True, apre come nuovo TAB nella finestra WT esistente
+    Tipo, mtime e dimensione arrivano dalla stessa passata di os.scandir,
+    senza stat ripetuti. Ritorna una lista di (path, mtime, size).
+    Comprende le sessioni archiviate del progetto (vedi archive_session).
     """
-    if not os.path.isdir(project_path):
-        return False
+    files = _scan_jsonl_dir(project_dir, SESSION_SUFFIXES[:1])
+    if Path(project_dir).name in archived_folder_names():
+        files += _scan_jsonl_dir(get_archive_dir() / Path(project_dir).name, SESSION_SUFFIXES[1:])
+    return files
+
+def _scan_jsonl_dir(directory, suffixes):
+    files = []
+    IO_COUNTERS.add('scandir')
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(suffixes):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if not SCANDIR_STAT_IS_FREE:
+                    IO_COUNTERS.add('stat')
+                files.append((entry.path, st.st_mtime, st.st_size))
+    except OSError:
+        pass
+    return files
 
-    drive = ""
-    if len(project_path) >= 2 and project_path[1] == ':':
-        drive = project_path[0:2]
+def scan_project_folders(projects_dir):
+    """Elenca le cartelle progetto con una sola enumerazione"""
+    folders = []
+    IO_COUNTERS.add('scandir')
+    try:
+        with os.scandir(projects_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        folders.append(Path(entry.path))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return folders
 
-    # Costruisci il comando Claude
-    if new_session:
-        # NUOVA SESSIONE - senza --resume
-        claude_cmd = "claude --dangerously-skip-permissions"
-        session_type = "NUOVA SESSIONE"
-    elif session_id:
-        # Riprendi sessione specifica
-        claude_cmd = f"claude --dangerously-skip-permissions --resume {session_id}"
-        session_type = f"Sessione: {session_id[:8]}..."
-    else:
-        # Riprendi ultima sessione (menu selezione)
-        claude_cmd = "claude --dangerously-skip-permissions --resume"
-        session_type = "RIPRENDI SESSIONE"
+# Budget per cercare il primo messaggio dell'utente in una sessione
+SUMMARY_MAX_BYTES = 256 * 1024
+SUMMARY_MAX_LINES = 200
+SUMMARY_LENGTH = 50
 
-    project_name = os.path.basename(project_path)
+# Riassunti già calcolati: {path: (size, mtime, riassunto)}
+_summary_cache = {}
+_summary_lock = threading.Lock()
 
-    if sys.platform == 'win32':
-        batch_content = f'''@echo off
-chcp 65001 >nul
-{drive}
-cd "{project_path}"
-cls
-echo.
-echo ══════════════════════════════════════════════════════════════
-echo   Claude Code - {project_name}
-echo   Modalita: {session_type}
-echo   [Click destro per incollare]
-echo ══════════════════════════════════════════════════════════════
-echo.
-{claude_cmd}
-'''
+def find_first_prompt(jsonl_path, max_bytes=SUMMARY_MAX_BYTES, max_lines=SUMMARY_MAX_LINES):
+    """
+    Cerca il primo messaggio scritto dall'utente entro un budget di byte e righe
 
-        temp_dir = tempfile.gettempdir()
-        # Usa nome unico per batch file per evitare conflitti con tab multipli
-        batch_filename = f"claude_launch_{project_name.replace(' ', '_')}_{id(project_path)}.bat"
-        batch_path = os.path.join(temp_dir, batch_filename)
+    Le prime righe di una sessione sono spesso riassunti, snapshot o
+    metadati: si va avanti fino al primo messaggio vero (vedi
+    extract_user_prompt), decodificando solo le righe di tipo user.
+    """
+    try:
+        IO_COUNTERS.add('open')
+        with open_session(jsonl_path) as f:
+            IO_COUNTERS.add('read')
+            data = f.read(max_bytes)
+            at_eof = len(data) < max_bytes
+    except SESSION_READ_ERRORS:
+        return None
+    
+    lines = data.split(b"\n", max_lines)[:max_lines]
+    if not at_eof and len(lines) < max_lines:
+        # L'ultima riga può essere tagliata a metà
+        lines = lines[:-1]
+    for line in lines:
+        if not any(p in line for p in USER_PREFILTER):
+            continue
+        try:
+            prompt = extract_user_prompt(decode_jsonl_line(line))
+        except ValueError:
+            continue
+        if prompt:
+            return prompt
+    return None
 
-        with open(batch_path, 'w', encoding='utf-8') as f:
-            f.write(batch_content)
+def get_session_summary(jsonl_path, size=None, mtime=None):
+    """
+    Estrae un riassunto dalla sessione: l'inizio del primo messaggio dell'utente
 
-        if as_new_tab:
-            # Apri come NUOVO TAB nella finestra Windows Terminal esistente
+    Il risultato resta in cache per (path, size, mtime); size e mtime si
+    possono passare se già noti, altrimenti vengono letti dal disco.
+    """
+    key = str(jsonl_path)
+    if size is None or mtime is None:
+        try:
+            st = os.stat(jsonl_path)
+            IO_COUNTERS.add('stat')
+        except OSError:
+            return None
+        size, mtime = st.st_size, st.st_mtime
+    
+    with _summary_lock:
+        cached = _summary_cache.get(key)
+    if cached and cached[0] == size and cached[1] == mtime:
+        return cached[2]
+    
+    summary = find_first_prompt(jsonl_path)
+    if summary:
+        summary = " ".join(summary.split())
+        if len(summary) > SUMMARY_LENGTH:
+            summary = summary[:SUMMARY_LENGTH] + "..."
+    with _summary_lock:
+        _summary_cache[key] = (size, mtime, summary)
+    return summary
+
+# ============================================================
+#                    ARCHIVIO SESSIONI
+# ============================================================
+
+# Sessioni archiviate: zstd se il modulo zstandard è installato, altrimenti gzip
+SESSION_SUFFIXES = ('.jsonl', '.jsonl.zst', '.jsonl.gz')
+ARCHIVE_SUFFIX = '.jsonl.zst' if zstandard is not None else '.jsonl.gz'
+
+# Età (giorni dall'ultima modifica) oltre la quale si propone di archiviare
+try:
+    ARCHIVE_AFTER_DAYS = int(os.environ.get("CLAUDE_LAUNCHER_ARCHIVE_DAYS", "30"))
+except ValueError:
+    ARCHIVE_AFTER_DAYS = 30
+
+def get_archive_dir():
+    """Cartella dell'archivio: ~/.claude/launcher-archive/<cartella progetto>/"""
+    return get_claude_projects_dir().parent / "launcher-archive"
+
+def is_archived_session(path):
+    return str(path).endswith(SESSION_SUFFIXES[1:])
+
+def session_id_from_path(path):
+    """ID della sessione dal nome del file, compresso o no"""
+    name = Path(path).name
+    return name[:name.index('.jsonl')] if '.jsonl' in name else Path(path).stem
+
+# Errori di lettura di una sessione: un archivio troncato o corrotto non
+# solleva OSError ma EOFError, zlib.error o ZstdError
+SESSION_READ_ERRORS = (OSError, EOFError, zlib.error) + (
+    (zstandard.ZstdError,) if zstandard is not None else ())
+
+
+class ZstdSessionReader(io.RawIOBase):
+    """
+    Sessione .zst in sola lettura, decompressa in streaming come gzip.open
+
+    Un seek in avanti decomprime e scarta, uno all'indietro riparte
+    dall'inizio del file: la memoria resta limitata al blocco letto e una
+    lettura parziale (cwd, primo messaggio, una pagina) non decomprime
+    tutta la sessione.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self._file = open(path, 'rb')
+        self._rewind()
+
+    def _rewind(self):
+        self._file.seek(0)
+        self._reader = zstandard.ZstdDecompressor().stream_reader(
+            self._file, closefd=False, read_across_frames=True)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._reader.read(len(buffer))
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            while True:
+                data = self._reader.read(META_CHUNK_BYTES)
+                if not data:
+                    break
+                self._pos += len(data)
+            offset += self._pos
+        if offset < self._pos:
+            self._rewind()
+        while self._pos < offset:
+            data = self._reader.read(min(offset - self._pos, META_CHUNK_BYTES))
+            if not data:
+                break
+            self._pos += len(data)
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._reader.close()
+            self._file.close()
+        super().close()
+
+
+def open_session(path):
+    """
+    Apre una sessione in lettura binaria, decomprimendola se archiviata
+
+    gzip e zstd si leggono in streaming (vedi ZstdSessionReader): il seek
+    all'indietro è possibile ma riparte dall'inizio del file.
+    """
+    name = str(path)
+    if name.endswith('.gz'):
+        return gzip.open(name, 'rb')
+    if name.endswith('.zst'):
+        if zstandard is None:
+            raise OSError(f"zstandard non installato: impossibile leggere {name}")
+        return io.BufferedReader(ZstdSessionReader(name))
+    return open(name, 'rb')
+
+# Cartelle progetto con almeno una sessione archiviata (None = da rileggere).
+# L'archivio lo scrive solo il launcher, che la azzera a ogni modifica.
+_archived_folders = None
+_archived_folders_lock = threading.Lock()
+
+def archived_folder_names():
+    """Nomi delle cartelle progetto presenti nell'archivio (una sola enumerazione)"""
+    global _archived_folders
+    with _archived_folders_lock:
+        if _archived_folders is None:
+            names = set()
+            IO_COUNTERS.add('scandir')
+            try:
+                with os.scandir(get_archive_dir()) as entries:
+                    names = {entry.name for entry in entries if entry.is_dir()}
+            except OSError:
+                pass
+            _archived_folders = names
+        return _archived_folders
+
+def _forget_archived_folders():
+    global _archived_folders
+    with _archived_folders_lock:
+        _archived_folders = None
+
+def _copy_to_temp(src, directory, suffix, compress):
+    """Scrive src (compresso o decompresso) in un file temporaneo di directory"""
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=suffix + ".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as dst:
+            if compress and suffix.endswith('.zst'):
+                with zstandard.ZstdCompressor(level=10).stream_writer(dst, closefd=False) as z:
+                    shutil.copyfileobj(src, z)
+            elif compress:
+                with gzip.GzipFile(fileobj=dst, mode='wb', mtime=0) as z:
+                    shutil.copyfileobj(src, z)
+            else:
+                shutil.copyfileobj(src, dst)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+def archive_session(jsonl_path):
+    """
+    Comprime una sessione nell'archivio e rimuove l'originale
+
+    L'archivio mantiene l'mtime della sessione; viene scritto in un file
+    temporaneo e rinominato, quindi una sessione non è mai a metà.
+    Ritorna il percorso dell'archivio, None se la sessione è cambiata
+    durante la compressione (in uso) o non si può leggere.
+    """
+    src = Path(jsonl_path)
+    target_dir = get_archive_dir() / src.parent.name
+    target = target_dir / (session_id_from_path(src) + ARCHIVE_SUFFIX)
+    try:
+        st = src.stat()
+        target_dir.mkdir(parents=True, exist_ok=True)
+        with open(src, 'rb') as f:
+            tmp_path = _copy_to_temp(f, target_dir, ARCHIVE_SUFFIX, compress=True)
+        after = src.stat()
+        if (after.st_size, after.st_mtime) != (st.st_size, st.st_mtime):
+            os.unlink(tmp_path)
+            return None
+        os.utime(tmp_path, (st.st_atime, st.st_mtime))
+        os.replace(tmp_path, target)
+        src.unlink()
+    except OSError:
+        return None
+    _forget_archived_folders()
+    return target
+
+def restore_session(archive_path):
+    """
+    Decomprime una sessione archiviata al suo posto in ~/.claude/projects
+
+    Ritorna il percorso del .jsonl ripristinato (None in caso di errore).
+    """
+    archive_path = Path(archive_path)
+    target_dir = get_claude_projects_dir() / archive_path.parent.name
+    target = target_dir / (session_id_from_path(archive_path) + '.jsonl')
+    try:
+        st = archive_path.stat()
+        target_dir.mkdir(parents=True, exist_ok=True)
+        with open_session(archive_path) as f:
+            tmp_path = _copy_to_temp(f, target_dir, '.jsonl', compress=False)
+        os.utime(tmp_path, (st.st_atime, st.st_mtime))
+        os.replace(tmp_path, target)
+        archive_path.unlink()
+    except SESSION_READ_ERRORS:
+        return None
+    _forget_archived_folders()
+    return target
+
+def restore_for_resume(folder_name, session_id):
+    """
+    Prima di riprendere una sessione la ripristina se è archiviata
+
+    Ritorna True se la sessione è pronta in ~/.claude/projects.
+    """
+    if (get_claude_projects_dir() / folder_name / f"{session_id}.jsonl").exists():
+        return True
+    for suffix in SESSION_SUFFIXES[1:]:
+        archived = get_archive_dir() / folder_name / f"{session_id}{suffix}"
+        if archived.exists():
+            return restore_session(archived) is not None
+    return False
+
+def archive_old_sessions(max_age_days=ARCHIVE_AFTER_DAYS, cancel_event=None):
+    """
+    Archivia le sessioni non modificate da più di max_age_days giorni
+
+    Ritorna (sessioni archiviate, byte originali, byte compressi).
+    """
+    cutoff = time.time() - max_age_days * 86400
+    archived = 0
+    original = 0
+    compressed = 0
+    for folder in scan_project_folders(get_claude_projects_dir()):
+        for path, mtime, size in _scan_jsonl_dir(folder, SESSION_SUFFIXES[:1]):
+            if cancel_event and cancel_event.is_set():
+                return archived, original, compressed
+            if mtime >= cutoff:
+                continue
+            target = archive_session(path)
+            if target:
+                archived += 1
+                original += size
+                compressed += target.stat().st_size
+    return archived, original, compressed
+
+# ============================================================
+#                    METADATI SESSIONI
+# ============================================================
+
+# Byte iniziali usati per riconoscere un file riscritto (stesso inizio = stesso file)
+META_HEAD_BYTES = 4096
+# Dimensione dei blocchi letti durante l'estrazione
+META_CHUNK_BYTES = 1024 * 1024
+
+# Prefissi dei messaggi utente generati da Claude Code e non scritti dall'utente
+SYNTHETIC_PROMPT_PREFIXES = (
+    "<command-", "<local-command-", "Caveat:", "[Request interrupted",
+)
+
+# Campi usage dei messaggi assistente -> colonne dei metadati
+USAGE_FIELDS = (
+    ('input_tokens', 'input_tokens'),
+    ('output_tokens', 'output_tokens'),
+    ('cache_creation_input_tokens', 'cache_creation_tokens'),
+    ('cache_read_input_tokens', 'cache_read_tokens'),
+)
+
+META_FIELDS = (
+    'offset', 'head_hash', 'size', 'mtime', 'message_count', 'first_prompt',
+    'last_timestamp', 'model', 'input_tokens', 'output_tokens',
+    'cache_creation_tokens', 'cache_read_tokens', 'last_message_id',
+    'root_key', 'leaf_key', 'uuid_count',
+)
+
+def empty_session_meta():
+    """Stato iniziale dell'estrazione: nulla ancora letto"""
+    meta = dict.fromkeys(META_FIELDS)
+    meta.update({
+        'offset': 0, 'size': 0, 'mtime': 0, 'message_count': 0, 'uuid_count': 0,
+        'input_tokens': 0, 'output_tokens': 0,
+        'cache_creation_tokens': 0, 'cache_read_tokens': 0,
+    })
+    return meta
+
+def extract_user_prompt(record):
+    """
+    Ritorna il testo scritto dall'utente in un record, o None
+
+    Scarta i record meta, i risultati dei tool e i messaggi generati
+    dai comandi (/clear, /model, ...).
+    """
+    if not isinstance(record, dict) or record.get('type') != 'user':
+        return None
+    if record.get('isMeta') or record.get('isSidechain'):
+        return None
+    message = record.get('message')
+    if not isinstance(message, dict):
+        return None
+    content = message.get('content')
+    if isinstance(content, list):
+        texts = [block.get('text') for block in content
+                 if isinstance(block, dict) and block.get('type') == 'text']
+        content = "\n".join(t for t in texts if isinstance(t, str))
+    if not isinstance(content, str):
+        return None
+    content = content.strip()
+    if not content or content.startswith(SYNTHETIC_PROMPT_PREFIXES):
+        return None
+    return content
+
+def uuid_key(value):
+    """Chiave intera (60 bit) di un uuid o di un percorso, per le tabelle di lineage"""
+    if len(value) == 36 and value.count('-') == 4:
+        return int(value.replace('-', '')[:15], 16)
+    return int(hashlib.sha1(value.encode('utf-8')).hexdigest()[:15], 16)
+
+def apply_session_record(meta, record):
+    """Aggiorna i metadati con un record della sessione"""
+    if not isinstance(record, dict):
+        return
+    timestamp = record.get('timestamp')
+    if isinstance(timestamp, str):
+        meta['last_timestamp'] = timestamp
+    
+    # Catena dei messaggi: una sessione ripresa o duplicata ricopia gli
+    # stessi uuid, così si riconosce quale sessione ne continua un'altra
+    uuid = record.get('uuid')
+    if isinstance(uuid, str) and uuid:
+        key = uuid_key(uuid)
+        if meta['root_key'] is None:
+            meta['root_key'] = key
+        meta['leaf_key'] = key
+        meta['uuid_count'] += 1
+        meta.setdefault('uuids', []).append(key)
+    
+    # Si contano i messaggi della conversazione, risultati dei tool compresi
+    kind = record.get('type')
+    if kind == 'user':
+        if meta['first_prompt'] is None:
+            meta['first_prompt'] = extract_user_prompt(record)
+        meta['message_count'] += 1
+    elif kind == 'assistant':
+        message = record.get('message')
+        if not isinstance(message, dict):
+            return
+        # Un messaggio con più blocchi occupa più righe consecutive,
+        # ognuna con lo stesso id e lo stesso usage: si conta una volta
+        message_id = message.get('id')
+        if message_id and message_id == meta['last_message_id']:
+            return
+        meta['last_message_id'] = message_id
+        meta['message_count'] += 1
+        model = message.get('model')
+        if isinstance(model, str) and not model.startswith('<'):
+            meta['model'] = model
+        else:
+            model = None
+        usage = message.get('usage')
+        if not isinstance(usage, dict):
+            return
+        # Consumi delle righe appena lette per id del messaggio: una sessione
+        # ripresa ricopia gli stessi messaggi, che il report conta una volta
+        # sola (vedi SessionIndex.get_usage)
+        day = timestamp[:10] if isinstance(timestamp, str) else ""
+        row = [model or "", day]
+        for key, field in USAGE_FIELDS:
+            value = usage.get(key)
+            value = value if isinstance(value, int) else 0
+            meta[field] += value
+            row.append(value)
+        message_key = message_id or uuid
+        if isinstance(message_key, str) and message_key:
+            meta.setdefault('usage', {}).setdefault(uuid_key(message_key), row)
+
+def _head_hash(f, length):
+    f.seek(0)
+    IO_COUNTERS.add('read')
+    return hashlib.sha1(f.read(length)).hexdigest()
+
+def appended_offset(f, size, offset, head_hash):
+    """
+    Offset da cui riprendere la lettura di una sessione già letta fino a offset
+
+    Ritorna 0 se il file si è accorciato o l'inizio è cambiato (riscritto).
+    """
+    if not offset:
+        return 0
+    if size < offset or _head_hash(f, min(offset, META_HEAD_BYTES)) != head_hash:
+        return 0
+    return offset
+
+def updated_head_hash(f, start, offset, head_hash):
+    """Hash dei primi min(offset, META_HEAD_BYTES) byte dopo una lettura da start a offset"""
+    if start < META_HEAD_BYTES:
+        return _head_hash(f, min(offset, META_HEAD_BYTES))
+    return head_hash
+
+def iter_jsonl_lines(f, offset, prefilter=None):
+    """
+    Legge le righe complete di un file JSONL (binario) a partire da offset
+
+    Ritorna terne (offset di inizio riga, offset di fine riga, riga) senza
+    decodificarle. Le righe senza newline finale non sono ancora complete
+    e restano per la lettura successiva; quelle vuote vengono saltate, e
+    così quelle che non contengono nessuno dei pattern di prefilter (vedi
+    type_prefilter).
+    """
+    f.seek(offset)
+    pending = b""
+    while True:
+        IO_COUNTERS.add('read')
+        chunk = f.read(META_CHUNK_BYTES)
+        if not chunk:
+            return
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            line_start = offset
+            offset += len(line) + 1
+            if not line.strip():
+                continue
+            if prefilter and not any(p in line for p in prefilter):
+                continue
+            yield line_start, offset, line
+
+def iter_appended_records(f, offset, prefilter=None):
+    """
+    Come iter_jsonl_lines, ma decodifica le righe: ritorna terne
+    (offset di inizio riga, offset di fine riga, record) e salta quelle
+    non valide.
+    """
+    for line_start, line_end, line in iter_jsonl_lines(f, offset, prefilter):
+        try:
+            record = decode_jsonl_line(line)
+        except ValueError:
+            continue
+        yield line_start, line_end, record
+
+def extract_session_meta(jsonl_path, meta=None):
+    """
+    Estrae (o aggiorna) i metadati di una sessione
+
+    meta è lo stato salvato dall'estrazione precedente: se il file è solo
+    cresciuto vengono lette soltanto le righe aggiunte dopo meta['offset'].
+    Se il file si è accorciato o l'inizio è cambiato (riscritto) si
+    riparte da zero.
+    Ritorna il nuovo stato (un nuovo dizionario), o meta invariato se il
+    file non si può leggere (anche a metà lettura). Se il file è stato letto,
+    lo stato contiene anche, per le sole righe lette, 'usage'
+    ({chiave del messaggio: [modello, giorno, token...]}) e 'uuids' (chiavi dei
+    messaggi), più 'reset' (True se riletto da capo) e 'base' (l'offset
+    dello stato di partenza, vedi SessionIndex.save_project_meta).
+    """
+    try:
+        st = os.stat(jsonl_path)
+        IO_COUNTERS.add('stat')
+    except OSError:
+        return meta
+    
+    if meta and meta['size'] == st.st_size and meta['mtime'] == st.st_mtime:
+        return meta
+    stored = meta
+    meta = dict(meta) if meta else empty_session_meta()
+    base = meta['offset']
+    
+    try:
+        IO_COUNTERS.add('open')
+        with open_session(jsonl_path) as f:
+            start = appended_offset(f, st.st_size, meta['offset'], meta['head_hash'])
+            if start == 0 and meta['offset']:
+                meta = empty_session_meta()
+            meta['usage'] = {}
+            meta['uuids'] = []
+            meta['reset'] = start == 0
+            meta['base'] = base
+            
+            offset = start
+            for _, offset, record in iter_appended_records(f, start, MESSAGE_PREFILTER):
+                apply_session_record(meta, record)
+            
+            meta['offset'] = max(offset, start)
+            meta['head_hash'] = updated_head_hash(f, start, meta['offset'], meta['head_hash'])
+    except SESSION_READ_ERRORS:
+        # Le righe già applicate non hanno spostato l'offset: salvarle
+        # farebbe ricontare le stesse righe alla lettura successiva
+        return stored
+    
+    meta['size'] = st.st_size
+    meta['mtime'] = st.st_mtime
+    return meta
+
+def get_session_preview(jsonl_path, width=300):
+    """
+    Ultima attività della sessione: ultimo messaggio utente e ultima risposta
+
+    Legge solo gli ultimi messaggi (read_session_tail). Ritorna una lista
+    di (ruolo, testo) dal più vecchio, vuota se in coda non ci sono messaggi.
+    """
+    last = {}
+    for record in reversed(read_session_tail(jsonl_path, n=50)):
+        found = extract_message_text(record)
+        if found and found[0] not in last:
+            last[found[0]] = (len(last), found[1])
+            if len(last) == 2:
+                break
+    preview = sorted(((order, role, text) for role, (order, text) in last.items()), reverse=True)
+    return [(role, text if len(text) <= width else text[:width] + "...")
+            for _, role, text in preview]
+
+# ============================================================
+#                    INDICE DELLE RIGHE (accesso posizionale)
+# ============================================================
+
+# Tipi di record distinti nell'indice delle righe (codice = posizione)
+LINE_TYPES = ('other', 'user', 'assistant', 'system', 'summary')
+LINE_TYPE_CODES = {name.encode(): code for code, name in enumerate(LINE_TYPES) if code}
+MESSAGE_LINE_TYPES = (LINE_TYPE_CODES[b'user'], LINE_TYPE_CODES[b'assistant'])
+# Sotto questa dimensione il file si rilegge in pochi ms: niente sidecar su disco
+LINE_INDEX_MIN_BYTES = 1024 * 1024
+# Intestazione del sidecar: magic, versione, offset letto, hash dell'inizio, righe
+LINE_INDEX_HEADER = struct.Struct('<4sHQ40sQ')
+LINE_INDEX_MAGIC = b'CLLX'
+LINE_INDEX_VERSION = 1
+
+# "type":"..." non escapato, cioè una chiave vera e non testo dentro una stringa
+_TYPE_RE = re.compile(rb'"type"\s*:\s*"([^"\\]*)"')
+
+def get_line_index_dir():
+    """Cartella dei sidecar: ~/.claude/launcher-index/<cartella progetto>/"""
+    return get_claude_projects_dir().parent / "launcher-index"
+
+def line_type_code(line):
+    """
+    Codice del tipo di record di una riga, senza decodificarla
+
+    Il "type" del record non è sempre la prima chiave (nei messaggi
+    assistente viene dopo message, che ha "type":"message"): vale la prima
+    chiave type con un valore noto.
+    """
+    for match in _TYPE_RE.finditer(line):
+        code = LINE_TYPE_CODES.get(match.group(1))
+        if code:
+            return code
+    return 0
+
+class SessionLineIndex:
+    """
+    Indice delle righe di una sessione, per leggerla in qualunque punto
+
+    Per ogni riga tiene l'offset di inizio (array di interi a 8 byte) e il
+    codice del tipo di record (1 byte), raccolti in una sola passata in
+    streaming senza decodificare il JSON. update() legge solo le righe
+    aggiunte dopo l'ultima volta; se il file si è accorciato o l'inizio è
+    cambiato (riscritto) riparte da capo, come per i metadati.
+
+    Per le sessioni oltre LINE_INDEX_MIN_BYTES l'indice si salva in un
+    sidecar in get_line_index_dir(), chiamato come la sessione: gli offset
+    sono quelli del contenuto decompresso, quindi il sidecar resta valido
+    anche dopo l'archiviazione. read() è l'unico punto da cui si leggono
+    righe per posizione (visualizzatore, risultati della ricerca, coda).
+    Sulle sessioni archiviate in gzip il seek è emulato (si decomprime fino
+    al punto richiesto).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.sidecar = (get_line_index_dir() / self.path.parent.name /
+                        (session_id_from_path(self.path) + '.idx'))
+        self.offsets = array('Q')
+        self.types = array('B')
+        self.end = 0
+        self.head_hash = None
+        self.stat = None
+        self.loaded = False
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def load(self):
+        """Carica il sidecar, se c'è; ritorna True se è stato letto"""
+        self.loaded = True
+        try:
+            with open(self.sidecar, 'rb') as f:
+                IO_COUNTERS.add('read')
+                header = f.read(LINE_INDEX_HEADER.size)
+                magic, version, end, head_hash, count = LINE_INDEX_HEADER.unpack(header)
+                if magic != LINE_INDEX_MAGIC or version != LINE_INDEX_VERSION:
+                    return False
+                offsets = array('Q')
+                offsets.fromfile(f, count)
+                types = array('B')
+                types.fromfile(f, count)
+        except (OSError, EOFError, struct.error, ValueError):
+            return False
+        self.offsets, self.types = offsets, types
+        self.end, self.head_hash = end, head_hash.decode('ascii')
+        return True
+
+    def save(self):
+        """Scrive il sidecar (file temporaneo + os.replace)"""
+        tmp_path = None
+        try:
+            self.sidecar.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".idx_", suffix=".tmp",
+                                            dir=str(self.sidecar.parent))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(LINE_INDEX_HEADER.pack(LINE_INDEX_MAGIC, LINE_INDEX_VERSION, self.end,
+                                               self.head_hash.encode('ascii'), len(self.offsets)))
+                self.offsets.tofile(f)
+                self.types.tofile(f)
+            os.replace(tmp_path, self.sidecar)
+            tmp_path = None
+        except OSError:
+            pass
+        finally:
+            if tmp_path:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def update(self, cancel_event=None):
+        """
+        Porta l'indice in pari con il file; ritorna False se annullato
+
+        Senza modifiche dall'ultima chiamata (stessa dimensione e mtime)
+        non legge nulla.
+        """
+        try:
+            st = self.path.stat()
+            IO_COUNTERS.add('stat')
+        except OSError:
+            return True
+        if self.stat == (st.st_size, st.st_mtime):
+            return True
+        if not self.loaded:
+            self.load()
+        # Le sessioni archiviate non crescono: la dimensione su disco è quella compressa
+        size = self.end if is_archived_session(self.path) else st.st_size
+
+        IO_COUNTERS.add('open')
+        with open_session(self.path) as f:
+            start = appended_offset(f, size, self.end, self.head_hash)
+            if start == 0 and self.end:
+                self.offsets = array('Q')
+                self.types = array('B')
+            end = start
+            for line_start, end, line in iter_jsonl_lines(f, start):
+                self.offsets.append(line_start)
+                self.types.append(line_type_code(line))
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+            self.head_hash = updated_head_hash(f, start, end, self.head_hash)
+        self.end = end
+        self.stat = (st.st_size, st.st_mtime)
+        if end != start and end >= LINE_INDEX_MIN_BYTES:
+            self.save()
+        return True
+
+    def lines(self, types=None):
+        """Numeri delle righe con uno dei codici types (tutte se None)"""
+        if types is None:
+            return array('L', range(len(self.offsets)))
+        return array('L', (i for i, code in enumerate(self.types) if code in types))
+
+    def read(self, line_numbers):
+        """Ritorna i record delle righe indicate (None per quelle non valide)"""
+        records = []
+        IO_COUNTERS.add('open')
+        with open_session(self.path) as f:
+            for number in line_numbers:
+                f.seek(self.offsets[number])
+                IO_COUNTERS.add('read')
+                try:
+                    records.append(decode_jsonl_line(f.readline()))
+                except ValueError:
+                    records.append(None)
+        return records
+
+    def line_of_offset(self, offset):
+        """Numero della riga che contiene il byte offset del file"""
+        if not self.offsets:
+            return 0
+        return max(0, bisect.bisect_right(self.offsets, offset) - 1)
+
+def read_session_tail(jsonl_path, n=20, types=MESSAGE_LINE_TYPES):
+    """
+    Ultimi n record (dei tipi indicati) di una sessione
+
+    Con un sidecar già presente, o per file piccoli, passa dall'indice
+    delle righe; la prima volta su una sessione grande non vale la pena di
+    leggerla tutta e si ripiega su read_jsonl_tail.
+    """
+    index = SessionLineIndex(jsonl_path)
+    try:
+        size = index.path.stat().st_size
+    except OSError:
+        return []
+    if size >= LINE_INDEX_MIN_BYTES and not index.load():
+        wanted = {LINE_TYPES[code] for code in types}
+        return [r for r in read_jsonl_tail(jsonl_path, n=n * 4)
+                if isinstance(r, dict) and r.get('type') in wanted][-n:]
+    try:
+        index.update()
+        return index.read(index.lines(types)[-n:])
+    except SESSION_READ_ERRORS:
+        return []
+
+# ============================================================
+#                    INDICE SESSIONI (SQLite)
+# ============================================================
+
+class SessionIndex:
+    """
+    Indice persistente delle sessioni su SQLite.
+
+    Ogni sessione è indicizzata per percorso del file .jsonl insieme a
+    mtime e dimensione: al refresh viene riletto solo un file nuovo o
+    cambiato, e le righe dei file cancellati vengono rimosse.
+    """
+
+    # Da incrementare quando cambia il formato delle tabelle ricavate dai file
+    SCHEMA_VERSION = 2
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            path TEXT PRIMARY KEY,
+            project TEXT NOT NULL,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL,
+            summary TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_project ON sessions(project);
+        CREATE TABLE IF NOT EXISTS session_meta (
+            path TEXT PRIMARY KEY,
+            project TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            head_hash TEXT,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            message_count INTEGER NOT NULL,
+            first_prompt TEXT,
+            last_timestamp TEXT,
+            model TEXT,
+            input_tokens INTEGER NOT NULL,
+            output_tokens INTEGER NOT NULL,
+            cache_creation_tokens INTEGER NOT NULL,
+            cache_read_tokens INTEGER NOT NULL,
+            last_message_id TEXT,
+            root_key INTEGER,
+            leaf_key INTEGER,
+            uuid_count INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_session_meta_project ON session_meta(project);
+        CREATE TABLE IF NOT EXISTS usage_messages (
+            message INTEGER NOT NULL,
+            path TEXT NOT NULL,
+            project TEXT NOT NULL,
+            model TEXT NOT NULL,
+            day TEXT NOT NULL,
+            input_tokens INTEGER NOT NULL,
+            output_tokens INTEGER NOT NULL,
+            cache_creation_tokens INTEGER NOT NULL,
+            cache_read_tokens INTEGER NOT NULL,
+            PRIMARY KEY (message, path)
+        );
+        CREATE INDEX IF NOT EXISTS idx_usage_messages_path ON usage_messages(path);
+        CREATE INDEX IF NOT EXISTS idx_usage_messages_project ON usage_messages(project);
+        CREATE TABLE IF NOT EXISTS message_uuids (
+            uuid INTEGER NOT NULL,
+            file INTEGER NOT NULL,
+            PRIMARY KEY (uuid, file)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_message_uuids_file ON message_uuids(file);
+        CREATE TABLE IF NOT EXISTS unresolved_paths (
+            folder TEXT PRIMARY KEY,
+            checked_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = str(db_path or get_index_path())
+        self.lock = threading.RLock()
+        self.conn = self._open(self.db_path)
+
+    def _open(self, db_path):
+        """Apre il database; se è corrotto o non scrivibile usa la memoria"""
+        try:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._create_schema(conn)
+            return conn
+        except sqlite3.Error:
+            pass
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._create_schema(conn)
+        return conn
+
+    def _create_schema(self, conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < self.SCHEMA_VERSION:
+            # Tabelle ricavate dai file con un formato precedente: si
+            # ricreano vuote e vengono riempite alla prossima lettura
+            conn.executescript("""
+                DROP TABLE IF EXISTS session_meta;
+                DROP TABLE IF EXISTS usage_rollup;
+                DROP TABLE IF EXISTS usage_messages;
+                DROP TABLE IF EXISTS message_uuids;
+            """)
+        conn.executescript(self.SCHEMA)
+        conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def get_project_sessions(self, project):
+        """Ritorna {path: (mtime, size, summary)} delle sessioni indicizzate"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT path, mtime, size, summary FROM sessions WHERE project = ?",
+                (project,)
+            ).fetchall()
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    def update_project(self, project, changed, removed):
+        """
+        Aggiorna l'indice di un progetto in un'unica transazione
+
+        Args:
+            project: nome della cartella del progetto
+            changed: lista di (path, mtime, size, summary) nuovi o modificati
+            removed: lista di path non più presenti su disco
+        """
+        with self.lock:
+            try:
+                with self.conn:
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO sessions (path, project, mtime, size, summary) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [(path, project, mtime, size, summary)
+                         for path, mtime, size, summary in changed]
+                    )
+                    self.conn.executemany(
+                        "DELETE FROM sessions WHERE path = ?",
+                        [(path,) for path in removed]
+                    )
+                    self.conn.executemany(
+                        "DELETE FROM session_meta WHERE path = ?",
+                        [(path,) for path in removed]
+                    )
+                    self.conn.executemany(
+                        "DELETE FROM usage_messages WHERE path = ?",
+                        [(path,) for path in removed]
+                    )
+                    self.conn.executemany(
+                        "DELETE FROM message_uuids WHERE file = ?",
+                        [(uuid_key(path),) for path in removed]
+                    )
+            except sqlite3.Error:
+                pass
+
+    def get_project_meta(self, project):
+        """Ritorna {path: metadati} delle sessioni di un progetto"""
+        columns = ", ".join(META_FIELDS)
+        with self.lock:
+            try:
+                rows = self.conn.execute(
+                    f"SELECT path, {columns} FROM session_meta WHERE project = ?",
+                    (project,)
+                ).fetchall()
+            except sqlite3.Error:
+                return {}
+        return {row[0]: dict(zip(META_FIELDS, row[1:])) for row in rows}
+
+    def save_project_meta(self, project, metas):
+        """
+        Salva i metadati estratti: metas è {path: metadati}
+
+        I consumi dei messaggi appena letti ('usage') si aggiungono a
+        usage_messages e i loro uuid ('uuids') a message_uuids; con 'reset'
+        la sessione è stata riletta da capo e i suoi dati vengono prima
+        azzerati.
+
+        Le somme valgono solo se partono dallo stato salvato: una sessione
+        il cui offset nell'indice non è più 'base' è già stata aggiornata
+        da un'altra estrazione (un altro thread o un'altra istanza) e viene
+        scartata, altrimenti le stesse righe verrebbero contate due volte.
+        """
+        columns = ", ".join(("path", "project") + META_FIELDS)
+        marks = ", ".join("?" * (len(META_FIELDS) + 2))
+        with self.lock:
+            try:
+                with self.conn:
+                    # Lettura e scrittura nella stessa transazione, che
+                    # blocca anche le scritture degli altri processi
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    stored = dict(self.conn.execute(
+                        "SELECT path, offset FROM session_meta WHERE project = ?", (project,)
+                    ))
+                    fresh = {}
+                    usage_rows = []
+                    reset = []
+                    uuids = []
+                    for path, meta in metas.items():
+                        base = meta.pop('base', None)
+                        is_reset = meta.pop('reset', False)
+                        usage = meta.pop('usage', {})
+                        keys = meta.pop('uuids', ())
+                        if base is None or stored.get(path, 0) != base:
+                            continue
+                        fresh[path] = meta
+                        file_key = uuid_key(path)
+                        if is_reset:
+                            reset.append((path, file_key))
+                        for message, row in usage.items():
+                            usage_rows.append((message, path, project, *row))
+                        uuids.extend((key, file_key) for key in keys)
+                    self.conn.executemany(
+                        f"INSERT OR REPLACE INTO session_meta ({columns}) VALUES ({marks})",
+                        [(path, project) + tuple(meta[k] for k in META_FIELDS)
+                         for path, meta in fresh.items()]
+                    )
+                    self.conn.executemany("DELETE FROM usage_messages WHERE path = ?",
+                                          [(path,) for path, _ in reset])
+                    self.conn.executemany("DELETE FROM message_uuids WHERE file = ?",
+                                          [(key,) for _, key in reset])
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO message_uuids (uuid, file) VALUES (?, ?)", uuids
+                    )
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO usage_messages (message, path, project, model, day, "
+                        "input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        usage_rows
+                    )
+            except sqlite3.Error:
+                pass
+
+    def get_continuations(self, project):
+        """
+        Sessioni del progetto contenute in altre sessioni
+
+        A è contenuta in B se l'ultimo messaggio di A compare anche in B.
+        Ritorna righe (chiave del file B, path di A); B può stare anche
+        in altri progetti.
+        """
+        with self.lock:
+            try:
+                return self.conn.execute(
+                    "SELECT u.file, a.path FROM session_meta a "
+                    "JOIN message_uuids u ON u.uuid = a.leaf_key "
+                    "WHERE a.project = ?",
+                    (project,)
+                ).fetchall()
+            except sqlite3.Error:
+                return []
+
+    def get_usage(self, group_by):
+        """
+        Consumi aggregati per group_by ('session', 'project', 'model' o 'day')
+
+        Ritorna righe (chiave, modello, messaggi, input, output, cache
+        write, cache read), separate per modello per poterne stimare il costo.
+        Un messaggio ricopiato in più file (sessione ripresa o duplicata)
+        si conta una volta sola, nel file in cui è stato letto per primo.
+        """
+        column = USAGE_GROUPS[group_by]
+        with self.lock:
+            try:
+                return self.conn.execute(
+                    f"SELECT {column}, model, COUNT(*), SUM(input_tokens), "
+                    f"SUM(output_tokens), SUM(cache_creation_tokens), SUM(cache_read_tokens) "
+                    f"FROM usage_messages WHERE rowid IN "
+                    f"(SELECT MIN(rowid) FROM usage_messages GROUP BY message) "
+                    f"GROUP BY {column}, model"
+                ).fetchall()
+            except sqlite3.Error:
+                return []
+
+    def prune_projects(self, existing):
+        """Rimuove dall'indice i progetti la cui cartella non esiste più"""
+        with self.lock:
+            try:
+                known = [row[0] for row in self.conn.execute(
+                    "SELECT project FROM sessions UNION SELECT project FROM session_meta"
+                )]
+                stale = [(name,) for name in known if name not in existing]
+                if stale:
+                    stale_files = [
+                        (uuid_key(row[0]),) for name in stale for row in self.conn.execute(
+                            "SELECT path FROM session_meta WHERE project = ?", name
+                        )
+                    ]
+                    with self.conn:
+                        self.conn.executemany("DELETE FROM message_uuids WHERE file = ?", stale_files)
+                        self.conn.executemany("DELETE FROM sessions WHERE project = ?", stale)
+                        self.conn.executemany("DELETE FROM session_meta WHERE project = ?", stale)
+                        self.conn.executemany("DELETE FROM usage_messages WHERE project = ?", stale)
+            except sqlite3.Error:
+                pass
+
+    def get_unresolved(self):
+        """Ritorna {cartella: timestamp} dei percorsi non risolti"""
+        with self.lock:
+            try:
+                return dict(self.conn.execute("SELECT folder, checked_at FROM unresolved_paths"))
+            except sqlite3.Error:
+                return {}
+
+    def mark_unresolved(self, folder, checked_at):
+        with self.lock:
+            try:
+                with self.conn:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO unresolved_paths (folder, checked_at) VALUES (?, ?)",
+                        (folder, checked_at)
+                    )
+            except sqlite3.Error:
+                pass
+
+    def clear_unresolved(self, folder=None):
+        """Rimuove una cartella (o tutte, con None) dai percorsi non risolti"""
+        with self.lock:
+            try:
+                with self.conn:
+                    if folder is None:
+                        self.conn.execute("DELETE FROM unresolved_paths")
+                    else:
+                        self.conn.execute("DELETE FROM unresolved_paths WHERE folder = ?", (folder,))
+            except sqlite3.Error:
+                pass
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_session_index = None
+
+def get_session_index():
+    """Ritorna l'indice sessioni condiviso (aperto alla prima richiesta)"""
+    global _session_index
+    if _session_index is None:
+        _session_index = SessionIndex()
+    return _session_index
+
+
+def build_lineage(sessions, continuations):
+    """
+    Raggruppa le sessioni che ne continuano altre (riprese o duplicate)
+
+    continuations sono le righe di SessionIndex.get_continuations().
+    Imposta in ogni sessione 'continued_by' (ID della sessione più breve
+    che la contiene, None per le punte) e, nelle punte, 'ancestors'
+    (ID delle sessioni che continuano, dalla più lunga). Tra due copie
+    identiche la punta è la più recente.
+    """
+    by_key = {uuid_key(str(s['path'])): s for s in sessions}
+    by_path = {str(s['path']): s for s in sessions}
+    by_id = {s['id']: s for s in sessions}
+    
+    def rank(session):
+        return ((session['meta'] or {}).get('uuid_count') or 0, session['modified'], session['id'])
+    
+    for session in sessions:
+        session['continued_by'] = None
+        session['ancestors'] = []
+    
+    for file_key, path in continuations:
+        container = by_key.get(file_key)
+        contained = by_path.get(path)
+        if not container or not contained or rank(container) <= rank(contained):
+            continue
+        current = contained['continued_by']
+        if current is None or rank(container) < rank(by_id[current]):
+            contained['continued_by'] = container['id']
+    
+    for session in sessions:
+        tip = session
+        while tip['continued_by']:
+            tip = by_id[tip['continued_by']]
+        if tip is not session:
+            tip['ancestors'].append(session)
+    for session in sessions:
+        session['ancestors'] = [a['id'] for a in sorted(session['ancestors'], key=rank, reverse=True)]
+
+def count_session_tips(project, files, index):
+    """
+    Numero di sessioni punta di un progetto senza aprire i file
+
+    Applica build_lineage ai metadati già salvati nell'indice (una sessione
+    mai letta conta come punta): lo stesso conteggio di load_project_sessions
+    finché i metadati sono aggiornati. files è l'elenco di scan_session_files().
+    """
+    metas = index.get_project_meta(project)
+    sessions = [{'id': session_id_from_path(path), 'path': path,
+                 'modified': mtime, 'meta': metas.get(path)}
+                for path, mtime, _ in files]
+    build_lineage(sessions, index.get_continuations(project))
+    return sum(1 for s in sessions if not s['continued_by'])
+
+def refresh_session_meta(project, stale, index, executor=None):
+    """
+    Aggiorna i metadati delle sessioni cambiate e li salva nell'indice
+
+    stale è una lista di (path, metadati salvati o None); ogni file viene
+    letto solo dall'ultimo offset (vedi extract_session_meta).
+    Ritorna {path: metadati} delle sessioni aggiornate.
+    """
+    paths = [path for path, _ in stale]
+    args = (paths, [meta for _, meta in stale])
+    if executor:
+        extracted = executor.map(extract_session_meta, *args)
+    else:
+        extracted = map(extract_session_meta, *args)
+    updated = {str(path): meta for path, meta in zip(paths, extracted) if meta}
+    if updated:
+        index.save_project_meta(project, updated)
+    return updated
+
+def folder_signature(files):
+    """Firma di una cartella progetto: (numero file, mtime massimo, dimensione totale)"""
+    if not files:
+        return (0, 0, 0)
+    return (len(files), max(f[1] for f in files), sum(f[2] for f in files))
+
+def get_project_info(project_dir, index=None, executor=None, files=None):
+    """
+    Estrae informazioni sul progetto
+
+    Se viene passato un SessionIndex, il riassunto delle sessioni con
+    mtime e dimensione invariati viene preso dall'indice senza aprire il file.
+    Con l'indice vengono aggiornati anche i metadati completi delle sessioni
+    (session_info['meta'], vedi extract_session_meta): di un file cresciuto
+    si leggono solo le righe aggiunte. Senza indice 'meta' resta None.
+    Se viene passato un executor, i file da rileggere sono letti in parallelo.
+    files può contenere l'elenco già prodotto da scan_session_files().
+    """
+    info = {
+        'sessions': [],
+        'last_modified': None,
+        'signature': None,
+    }
+    
+    known = index.get_project_sessions(project_dir.name) if index else {}
+    metas = index.get_project_meta(project_dir.name) if index else {}
+    changed = []
+    to_read = []
+    to_extract = []
+    
+    if files is None:
+        files = scan_session_files(project_dir)
+    info['signature'] = folder_signature(files)
+    
+    for path, mtime, size in files:
+        jf = Path(path)
+        session_info = {
+            'id': session_id_from_path(jf),
+            'path': jf,
+            'archived': is_archived_session(jf),
+            'modified': datetime.fromtimestamp(mtime),
+            'size': size,
+            'summary': None,
+            'meta': metas.get(path)
+        }
+        info['sessions'].append(session_info)
+        
+        meta = session_info['meta']
+        if index and not (meta and meta['mtime'] == mtime and meta['size'] == size):
+            to_extract.append(session_info)
+        
+        cached = known.pop(path, None)
+        if cached and cached[0] == mtime and cached[1] == size:
+            session_info['summary'] = cached[2]
+        elif cached and cached[2] and size >= cached[1]:
+            # Il primo messaggio non cambia quando la sessione cresce:
+            # il file si legge una volta sola
+            session_info['summary'] = cached[2]
+            changed.append((path, mtime, size, cached[2]))
+        else:
+            to_read.append((session_info, mtime, size))
+    
+    if to_read:
+        args = ([s['path'] for s, _, _ in to_read],
+                [size for _, _, size in to_read],
+                [mtime for _, mtime, _ in to_read])
+        if executor:
+            summaries = executor.map(get_session_summary, *args)
+        else:
+            summaries = map(get_session_summary, *args)
+        for (session_info, mtime, size), summary in zip(to_read, summaries):
+            session_info['summary'] = summary
+            changed.append((str(session_info['path']), mtime, size, summary))
+    
+    if to_extract:
+        updated = refresh_session_meta(
+            project_dir.name, [(s['path'], s['meta']) for s in to_extract], index, executor
+        )
+        for session_info in to_extract:
+            session_info['meta'] = updated.get(str(session_info['path']), session_info['meta'])
+    
+    build_lineage(info['sessions'], index.get_continuations(project_dir.name) if index else [])
+    
+    # Quello che resta in known è stato cancellato dal disco
+    if index and (changed or known):
+        index.update_project(project_dir.name, changed, list(known))
+    
+    info['sessions'].sort(key=lambda x: x['modified'], reverse=True)
+    
+    if info['sessions']:
+        info['last_modified'] = info['sessions'][0]['modified']
+    
+    return info
+
+# Sessioni caricate su richiesta: {folder_name: (firma cartella, sessioni)}
+_project_sessions_cache = {}
+_project_sessions_lock = threading.Lock()
+# Un caricamento alla volta per progetto: chi arriva dopo trova la cache
+_project_load_locks = {}
+
+def load_project_sessions(project, index=None, executor=None, files=None):
+    """
+    Carica (su richiesta) le sessioni di un progetto
+
+    Il risultato resta in cache finché la firma della cartella rilevata
+    dall'ultima scansione non cambia. Aggiorna anche session_count e
+    last_modified del progetto con i dati appena letti; session_count
+    conta solo le punte, non le sessioni continuate (vedi build_lineage).
+    index è il SessionIndex da usare per i riassunti (None = nessun indice).
+    Con l'indice può dover leggere molti file (metadati): dalla GUI va
+    chiamata in un thread.
+    """
+    folder_name = project['folder_name']
+    with _project_sessions_lock:
+        load_lock = _project_load_locks.setdefault(folder_name, threading.Lock())
+    with load_lock:
+        with _project_sessions_lock:
+            cached = _project_sessions_cache.get(folder_name)
+        if cached and files is None and cached[0] == project.get('signature'):
+            return cached[1]
+        
+        info = get_project_info(project['folder_path'], index, executor, files)
+        
+        project['signature'] = info['signature']
+        project['session_count'] = sum(1 for s in info['sessions'] if not s['continued_by'])
+        project['last_modified'] = info['last_modified']
+        with _project_sessions_lock:
+            _project_sessions_cache[folder_name] = (info['signature'], info['sessions'])
+        return info['sessions']
+
+def scan_project_folder(folder, index=None, executor=None, with_sessions=False):
+    """
+    Costruisce il dizionario di un progetto (None se non ha sessioni)
+
+    Passata economica: solo enumerazione della cartella, nessun file
+    aperto (con l'indice session_count conta già solo le punte, vedi
+    count_session_tips). Con with_sessions=True carica subito anche le
+    sessioni.
+    """
+    files = scan_session_files(folder)
+    
+    if not files:
+        return None
+    
+    signature = folder_signature(files)
+    real_path, path_candidates, path_unresolved = resolve_project_path(folder.name, files)
+    
+    project = {
+        'folder_name': folder.name,
+        'folder_path': folder,
+        'real_path': real_path,
+        'path_candidates': path_candidates,
+        'path_unresolved': path_unresolved,
+        'session_count': count_session_tips(folder.name, files, index) if index else signature[0],
+        'last_modified': datetime.fromtimestamp(signature[1]),
+        'signature': signature
+    }
+    
+    if with_sessions:
+        load_project_sessions(project, index, executor, files)
+    
+    return project
+
+def iter_projects(use_index=True, workers=None, with_sessions=False,
+                  cancel_event=None, on_start=None):
+    """
+    Genera i progetti man mano che la scansione li trova (ordine non garantito)
+
+    Args:
+        use_index: usa l'indice persistente delle sessioni
+        workers: numero di thread per la scansione (default SCAN_WORKERS,
+                 1 = scansione seriale)
+        with_sessions: carica subito le sessioni di ogni progetto
+        cancel_event: threading.Event che interrompe la scansione
+        on_start: callback chiamato con il numero di cartelle da scansionare
+    """
+    projects_dir = get_claude_projects_dir()
+    
+    IO_COUNTERS.reset()
+    IO_COUNTERS.add('stat')
+    if not projects_dir.exists():
+        if on_start:
+            on_start(0)
+        return
+    
+    if workers is None:
+        workers = SCAN_WORKERS
+    
+    index = get_session_index() if use_index else None
+    folders = scan_project_folders(projects_dir)
+    folder_names = {folder.name for folder in folders}
+    if on_start:
+        on_start(len(folders))
+    
+    # Mapping letti una volta per scansione, scritti una volta alla fine
+    mapping_store = get_path_mapping_store()
+    mapping_store.reload_if_changed()
+    get_path_resolver().clear()
+    try:
+        yield from _scan_folders(folders, index, workers, with_sessions, cancel_event)
+    finally:
+        mapping_store.flush()
+    
+    if cancel_event and cancel_event.is_set():
+        return
+    
+    # Solo una scansione completa può dire quali progetti sono spariti
+    if index:
+        index.prune_projects(folder_names)
+    with _project_sessions_lock:
+        for name in list(_project_sessions_cache):
+            if name not in folder_names:
+                del _project_sessions_cache[name]
+
+def _scan_folders(folders, index, workers, with_sessions, cancel_event):
+    """Scansiona le cartelle progetto (in serie o nel pool) e genera i progetti"""
+    if workers <= 1:
+        for folder in folders:
+            if cancel_event and cancel_event.is_set():
+                return
+            proj = scan_project_folder(folder, index, None, with_sessions)
+            if proj:
+                yield proj
+    else:
+        # Due pool separati: i task per cartella attendono i task per
+        # sessione, con un pool unico si rischierebbe il deadlock
+        with ThreadPoolExecutor(max_workers=workers) as session_pool, \
+                ThreadPoolExecutor(max_workers=workers) as folder_pool:
+            futures = [
+                folder_pool.submit(scan_project_folder, folder, index, session_pool, with_sessions)
+                for folder in folders
+            ]
+            try:
+                for future in as_completed(futures):
+                    if cancel_event and cancel_event.is_set():
+                        return
+                    proj = future.result()
+                    if proj:
+                        yield proj
+            finally:
+                # Scansione annullata o interrotta: niente task in coda
+                for future in futures:
+                    future.cancel()
+
+def list_projects(use_index=True, workers=None, with_sessions=False):
+    """
+    Lista tutti i progetti con sessioni
+
+    Di default è una passata economica a livello di progetto: le sessioni
+    si caricano su richiesta con load_project_sessions(). Con
+    with_sessions=True vengono caricate subito per tutti i progetti,
+    usando l'indice persistente (use_index=True) così un refresh rilegge
+    solo i file nuovi o modificati.
+
+    Args:
+        use_index: usa l'indice persistente delle sessioni
+        workers: numero di thread per la scansione (default SCAN_WORKERS,
+                 1 = scansione seriale)
+        with_sessions: carica subito le sessioni di ogni progetto
+    """
+    projects = list(iter_projects(use_index, workers, with_sessions))
+    
+    projects.sort(key=lambda x: x['last_modified'] or datetime.min, reverse=True)
+    
+    return projects
+
+class ProjectModel:
+    """
+    Progetti in memoria, ordinati per recenza e indicizzati per cartella.
+
+    Inserimenti e rimozioni trovano la posizione con una ricerca binaria,
+    così aggiornare un progetto non richiede di riordinare tutta la lista.
+    """
+
+    def __init__(self, projects=()):
+        self.items = []
+        self.keys = []
+        # {folder_name: (progetto, chiave con cui è stato inserito)}
+        self.by_folder = {}
+        for project in projects:
+            self.upsert(project)
+
+    @staticmethod
+    def sort_key(project):
+        # Più recente = chiave più piccola; senza data in fondo
+        if not project['last_modified']:
+            return float('inf')
+        return -project['last_modified'].timestamp()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def get(self, folder_name):
+        entry = self.by_folder.get(folder_name)
+        return entry[0] if entry else None
+
+    def index_of(self, folder_name):
+        """Posizione del progetto nella lista (None se assente)"""
+        entry = self.by_folder.get(folder_name)
+        if not entry:
+            return None
+        project, key = entry
+        index = bisect.bisect_left(self.keys, key)
+        while self.items[index] is not project:
+            index += 1
+        return index
+
+    def remove(self, folder_name):
+        """Rimuove un progetto, ritorna quello rimosso (o None)"""
+        index = self.index_of(folder_name)
+        if index is None:
+            return None
+        project = self.items.pop(index)
+        del self.keys[index]
+        del self.by_folder[folder_name]
+        return project
+
+    def upsert(self, project):
+        """Inserisce o riposiziona un progetto, ritorna la sua posizione"""
+        self.remove(project['folder_name'])
+        key = self.sort_key(project)
+        index = bisect.bisect_right(self.keys, key)
+        self.items.insert(index, project)
+        self.keys.insert(index, key)
+        self.by_folder[project['folder_name']] = (project, key)
+        return index
+
+
+# ============================================================
+#                    SNAPSHOT ELENCO PROGETTI
+# ============================================================
+
+SNAPSHOT_VERSION = 1
+# Campi di un progetto salvati nello snapshot (oltre a last_modified e signature)
+SNAPSHOT_FIELDS = ('folder_name', 'real_path', 'path_candidates', 'path_unresolved',
+                   'session_count')
+
+def save_projects_snapshot(projects, path=None):
+    """
+    Salva l'elenco progetti mostrato (file temporaneo + os.replace)
+
+    Solo i campi delle righe: all'avvio successivo l'elenco si disegna
+    subito da qui, senza toccare ~/.claude/projects.
+    """
+    path = Path(path) if path else get_snapshot_path()
+    data = {
+        'version': SNAPSHOT_VERSION,
+        'saved_at': time.time(),
+        'projects': [
+            dict({field: project.get(field) for field in SNAPSHOT_FIELDS},
+                 last_modified=(project['last_modified'].timestamp()
+                                if project['last_modified'] else None),
+                 signature=list(project['signature']))
+            for project in projects
+        ],
+    }
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=".claude_snapshot_", suffix=".tmp",
+                                        dir=str(path.parent))
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        tmp_path = None
+    except OSError:
+        pass
+    finally:
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+def load_projects_snapshot(path=None):
+    """
+    Rilegge lo snapshot: ritorna (progetti, istante del salvataggio)
+
+    I progetti hanno 'stale': True finché una scansione non li conferma.
+    Snapshot assente, illeggibile o di un'altra versione: ([], None).
+    """
+    path = Path(path) if path else get_snapshot_path()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != SNAPSHOT_VERSION:
+            return [], None
+        projects_dir = get_claude_projects_dir()
+        projects = []
+        for entry in data['projects']:
+            project = {field: entry[field] for field in SNAPSHOT_FIELDS}
+            project['folder_path'] = projects_dir / project['folder_name']
+            project['last_modified'] = (datetime.fromtimestamp(entry['last_modified'])
+                                        if entry['last_modified'] else None)
+            project['signature'] = tuple(entry['signature'])
+            project['stale'] = True
+            projects.append(project)
+        return projects, datetime.fromtimestamp(data['saved_at'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return [], None
+
+def same_project_row(old, new):
+    """True se la scansione ha trovato il progetto com'era (stessa riga)"""
+    return (old['signature'] == new['signature']
+            and all(old.get(field) == new.get(field)
+                    for field in ('real_path', 'path_candidates', 'path_unresolved')))
+
+
+# ============================================================
+#                    RICERCA NELLE SESSIONI
+# ============================================================
+
+# Sessioni (distinte) restituite al massimo da una ricerca
+SEARCH_LIMIT = 50
+
+def extract_message_text(record):
+    """Ritorna (ruolo, testo) di un messaggio utente o assistente, None per il resto"""
+    prompt = extract_user_prompt(record)
+    if prompt:
+        return 'user', prompt
+    if not isinstance(record, dict) or record.get('type') != 'assistant':
+        return None
+    message = record.get('message')
+    content = message.get('content') if isinstance(message, dict) else None
+    if isinstance(content, list):
+        texts = [block.get('text') for block in content
+                 if isinstance(block, dict) and block.get('type') == 'text']
+        content = "\n".join(t for t in texts if isinstance(t, str))
+    if isinstance(content, str) and content.strip():
+        return 'assistant', content.strip()
+    return None
+
+def make_snippet(text, terms, width=80):
+    """Estratto del testo attorno al primo termine trovato"""
+    lower = text.lower()
+    pos = min((lower.find(t.lower()) for t in terms if t.lower() in lower), default=0)
+    start = max(0, pos - width // 2)
+    snippet = text[start:start + width].replace("\n", " ")
+    if start > 0:
+        snippet = "…" + snippet
+    if start + width < len(text):
+        snippet += "…"
+    return snippet
+
+class SearchIndex:
+    """
+    Indice full-text dei messaggi di tutte le sessioni
+
+    Sta nello stesso database del SessionIndex: il testo dei messaggi utente
+    e assistente va in search_docs, indicizzato con FTS5 se SQLite lo
+    supporta (altrimenti la ricerca ripiega su LIKE). Per ogni file si
+    ricorda fin dove è stato letto, così a ogni aggiornamento vengono
+    indicizzate solo le righe aggiunte; un file accorciato o riscritto
+    viene reindicizzato da capo.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS search_docs (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            project TEXT NOT NULL,
+            role TEXT NOT NULL,
+            timestamp TEXT,
+            offset INTEGER,
+            text TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_search_docs_path ON search_docs(path);
+        CREATE TABLE IF NOT EXISTS search_files (
+            path TEXT PRIMARY KEY,
+            project TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            head_hash TEXT,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_search_files_project ON search_files(project);
+    """
+
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+            text, content='search_docs', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+        CREATE TRIGGER IF NOT EXISTS search_docs_ai AFTER INSERT ON search_docs BEGIN
+            INSERT INTO search_fts(rowid, text) VALUES (new.id, new.text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS search_docs_ad AFTER DELETE ON search_docs BEGIN
+            INSERT INTO search_fts(search_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        END;
+    """
+
+    def __init__(self, index):
+        self.conn = index.conn
+        self.lock = index.lock
+        # Un solo aggiornamento alla volta (scansione iniziale e watcher)
+        self.update_lock = threading.Lock()
+        self.fts = False
+        with self.lock:
+            try:
+                columns = {row[1] for row in self.conn.execute("PRAGMA table_info(search_docs)")}
+                if columns and 'offset' not in columns:
+                    # Indice di una versione senza offset dei messaggi: si ricostruisce
+                    self.conn.executescript("""
+                        DROP TRIGGER IF EXISTS search_docs_ai;
+                        DROP TRIGGER IF EXISTS search_docs_ad;
+                        DROP TABLE IF EXISTS search_fts;
+                        DROP TABLE IF EXISTS search_docs;
+                        DROP TABLE IF EXISTS search_files;
+                    """)
+            except sqlite3.Error:
+                pass
+            try:
+                self.conn.executescript(self.SCHEMA)
+            except sqlite3.Error:
+                pass
+            try:
+                self.conn.executescript(self.FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.Error:
+                # SQLite senza FTS5: si cerca con LIKE
+                pass
+
+    def update(self, folder_names=None, cancel_event=None):
+        """
+        Indicizza le righe nuove delle sessioni
+
+        folder_names limita l'aggiornamento alle cartelle indicate; con None
+        si passano tutte e si tolgono i progetti non più presenti.
+        """
+        with self.update_lock:
+            projects_dir = get_claude_projects_dir()
+            if folder_names is None:
+                folders = scan_project_folders(projects_dir)
+                self._prune_projects({folder.name for folder in folders})
+            else:
+                folders = [projects_dir / name for name in folder_names]
+            for folder in folders:
+                if cancel_event and cancel_event.is_set():
+                    return
+                self.update_folder(folder)
+
+    def update_folder(self, folder):
+        """Aggiorna l'indice di una cartella progetto"""
+        with self.lock:
+            try:
+                states = {row[0]: row[1:] for row in self.conn.execute(
+                    "SELECT path, offset, head_hash, size, mtime FROM search_files WHERE project = ?",
+                    (folder.name,)
+                )}
+            except sqlite3.Error:
+                return
+        
+        for path, mtime, size in scan_session_files(folder):
+            state = states.pop(path, None)
+            if state and state[2] == size and state[3] == mtime:
+                continue
+            self.index_file(folder.name, path, mtime, size, state)
+        
+        # Quello che resta è stato cancellato dal disco
+        if states:
+            self._delete_files(list(states))
+
+    def index_file(self, project, path, mtime, size, state=None):
+        """Indicizza le righe di un file aggiunte dopo l'ultima lettura"""
+        offset, head_hash = (state[0], state[1]) if state else (0, None)
+        docs = []
+        try:
+            IO_COUNTERS.add('open')
+            with open_session(path) as f:
+                start = appended_offset(f, size, offset, head_hash)
+                end = start
+                for line_start, end, record in iter_appended_records(f, start, MESSAGE_PREFILTER):
+                    found = extract_message_text(record)
+                    if found:
+                        docs.append((path, project, found[0], record.get('timestamp'),
+                                     line_start, found[1]))
+                end = max(end, start)
+                head_hash = updated_head_hash(f, start, end, head_hash)
+        except SESSION_READ_ERRORS:
+            return
+        
+        with self.lock:
+            try:
+                with self.conn:
+                    if start == 0 and offset:
+                        self.conn.execute("DELETE FROM search_docs WHERE path = ?", (path,))
+                    self.conn.executemany(
+                        "INSERT INTO search_docs (path, project, role, timestamp, offset, text) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        docs
+                    )
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO search_files (path, project, offset, head_hash, size, mtime) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (path, project, end, head_hash, size, mtime)
+                    )
+            except sqlite3.Error:
+                pass
+
+    def _delete_files(self, paths):
+        with self.lock:
+            try:
+                with self.conn:
+                    for path in paths:
+                        self.conn.execute("DELETE FROM search_docs WHERE path = ?", (path,))
+                        self.conn.execute("DELETE FROM search_files WHERE path = ?", (path,))
+            except sqlite3.Error:
+                pass
+
+    def _prune_projects(self, existing):
+        """Toglie dall'indice i progetti la cui cartella non esiste più"""
+        with self.lock:
+            try:
+                stale = [row[0] for row in self.conn.execute(
+                    "SELECT path FROM search_files"
+                ) if Path(row[0]).parent.name not in existing]
+            except sqlite3.Error:
+                return
+        if stale:
+            self._delete_files(stale)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """
+        Cerca i termini della query (tutti, anche come prefisso)
+
+        Ritorna al massimo limit sessioni distinte, dalla più pertinente:
+        lista di dict con path, project, session_id, role, timestamp, offset
+        (inizio della riga del messaggio nel file) e snippet.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        with self.lock:
+            try:
+                if self.fts:
+                    match = " ".join('"%s"*' % t.replace('"', '""') for t in terms)
+                    rows = self.conn.execute(
+                        "SELECT d.path, d.project, d.role, d.timestamp, d.offset, "
+                        "snippet(search_fts, 0, '', '', '…', 16) "
+                        "FROM search_fts JOIN search_docs d ON d.id = search_fts.rowid "
+                        "WHERE search_fts MATCH ? ORDER BY rank LIMIT ?",
+                        (match, limit * 10)
+                    ).fetchall()
+                else:
+                    like = " AND ".join("text LIKE ? ESCAPE '\\'" for _ in terms)
+                    patterns = ["%" + t.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                                for t in terms]
+                    rows = [
+                        (path, project, role, timestamp, offset, make_snippet(text, terms))
+                        for path, project, role, timestamp, offset, text in self.conn.execute(
+                            f"SELECT path, project, role, timestamp, offset, text FROM search_docs "
+                            f"WHERE {like} ORDER BY id DESC LIMIT ?",
+                            patterns + [limit * 10]
+                        )
+                    ]
+            except sqlite3.Error:
+                return []
+        
+        results = []
+        seen = set()
+        for path, project, role, timestamp, offset, snippet in rows:
+            if path in seen:
+                continue
+            seen.add(path)
+            results.append({
+                'path': path,
+                'project': project,
+                'session_id': session_id_from_path(path),
+                'role': role,
+                'timestamp': timestamp,
+                'offset': offset,
+                'snippet': snippet.replace("\n", " "),
+            })
+            if len(results) >= limit:
+                break
+        return results
+
+
+_search_index = None
+
+def get_search_index():
+    """Ritorna l'indice di ricerca condiviso (nello stesso database dell'indice sessioni)"""
+    global _search_index
+    if _search_index is None:
+        _search_index = SearchIndex(get_session_index())
+    return _search_index
+
+
+# ============================================================
+#                    TRASCRIZIONE SESSIONI
+# ============================================================
+
+# Messaggi per pagina nel visualizzatore
+TRANSCRIPT_PAGE_SIZE = 50
+# Caratteri mostrati al massimo per messaggio (i risultati dei tool sono enormi)
+TRANSCRIPT_MAX_CHARS = 4000
+
+def format_transcript_record(record, max_chars=TRANSCRIPT_MAX_CHARS):
+    """
+    Testo di un messaggio per il visualizzatore: ritorna (ruolo, testo)
+
+    Il ruolo è 'user', 'assistant', 'tool' (chiamate e risultati dei
+    tool) o 'meta' (messaggi generati da comandi e simili).
+    """
+    if not isinstance(record, dict):
+        return 'meta', "(riga non leggibile)"
+    found = extract_message_text(record)
+    message = record.get('message')
+    content = message.get('content') if isinstance(message, dict) else None
+    parts = [found[1]] if found else []
+    role = found[0] if found else ('meta' if record.get('type') == 'user' else 'assistant')
+
+    if isinstance(content, list):
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            if block.get('type') == 'tool_use':
+                arguments = json.dumps(block.get('input'), ensure_ascii=False)
+                if len(arguments) > 200:
+                    arguments = arguments[:200] + "…"
+                parts.append(f"🔧 {block.get('name', '?')}({arguments})")
+            elif block.get('type') == 'tool_result':
+                output = block.get('content')
+                if isinstance(output, list):
+                    output = "\n".join(b.get('text', '') for b in output
+                                       if isinstance(b, dict) and b.get('type') == 'text')
+                output = output if isinstance(output, str) else ""
+                lines = output.count("\n") + 1 if output else 0
+                first = output.strip().split("\n", 1)[0][:200]
+                parts.append(f"↳ {first} ({lines} righe)")
+        if not found and parts:
+            role = 'tool'
+
+    if not parts:
+        if isinstance(content, str) and content.strip():
+            parts.append(content.strip())
+        else:
+            parts.append("…")
+    text = "\n".join(parts)
+    if len(text) > max_chars:
+        text = text[:max_chars] + f"\n… ({len(text) - max_chars} caratteri omessi)"
+    return role, text
+
+
+# ============================================================
+#                    CONSUMI E COSTI
+# ============================================================
+
+# Raggruppamenti dei consumi -> colonna di usage_messages
+USAGE_GROUPS = {
+    'session': 'path',
+    'project': 'project',
+    'model': 'model',
+    'day': 'day',
+}
+
+# Prezzi stimati in USD per milione di token:
+# (frammento del nome modello, input, output, cache write, cache read).
+# Vince il primo frammento contenuto nel nome, quindi i più specifici prima.
+MODEL_PRICES = (
+    ("opus-4-5", 5.00, 25.00, 6.25, 0.50),
+    ("opus", 15.00, 75.00, 18.75, 1.50),
+    ("sonnet", 3.00, 15.00, 3.75, 0.30),
+    ("haiku-4-5", 1.00, 5.00, 1.25, 0.10),
+    ("haiku-3-5", 0.80, 4.00, 1.00, 0.08),
+    ("haiku", 0.25, 1.25, 0.30, 0.03),
+)
+
+def usage_cost(model, input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens):
+    """Costo stimato in USD, None se il modello non ha un prezzo noto"""
+    for fragment, *prices in MODEL_PRICES:
+        if fragment in model:
+            tokens = (input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens)
+            return sum(t * p for t, p in zip(tokens, prices)) / 1_000_000
+    return None
+
+def update_usage(index=None, cancel_event=None, executor=None):
+    """
+    Aggiorna i consumi aggregati di tutte le sessioni
+
+    Vengono lette solo le sessioni con mtime o dimensione cambiati, e di
+    queste solo le righe aggiunte; le sessioni e i progetti spariti
+    escono dagli aggregati.
+    """
+    index = index or get_session_index()
+    folders = scan_project_folders(get_claude_projects_dir())
+    for folder in folders:
+        if cancel_event and cancel_event.is_set():
+            return
+        files = scan_session_files(folder)
+        metas = index.get_project_meta(folder.name)
+        stale = []
+        for path, mtime, size in files:
+            meta = metas.pop(path, None)
+            if not (meta and meta['mtime'] == mtime and meta['size'] == size):
+                stale.append((path, meta))
+        if stale:
+            refresh_session_meta(folder.name, stale, index, executor)
+        # Quello che resta in metas è stato cancellato dal disco
+        if metas:
+            index.update_project(folder.name, [], list(metas))
+    index.prune_projects({folder.name for folder in folders})
+
+def usage_report(group_by, index=None):
+    """
+    Consumi aggregati per group_by (vedi USAGE_GROUPS), dal costo più alto
+
+    Ogni riga è un dict con key, messages, i quattro contatori di token,
+    cost (somma dei modelli con prezzo noto) e cost_partial (True se
+    qualche modello non ha prezzo). Per 'day' l'ordine è per data.
+    """
+    rows = {}
+    for key, model, *counts in (index or get_session_index()).get_usage(group_by):
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = {
+                'key': key, 'messages': 0, 'input_tokens': 0, 'output_tokens': 0,
+                'cache_creation_tokens': 0, 'cache_read_tokens': 0,
+                'cost': 0.0, 'cost_partial': False,
+            }
+        row['messages'] += counts[0]
+        for (_, field), value in zip(USAGE_FIELDS, counts[1:]):
+            row[field] += value
+        cost = usage_cost(model, *counts[1:])
+        if cost is None:
+            row['cost_partial'] = True
+        else:
+            row['cost'] += cost
+    
+    if group_by == 'day':
+        return sorted(rows.values(), key=lambda r: r['key'], reverse=True)
+    return sorted(rows.values(), key=lambda r: r['cost'], reverse=True)
+
+def usage_key_label(group_by, key):
+    """Etichetta leggibile della chiave di un raggruppamento"""
+    if group_by == 'session':
+        path = Path(key)
+        return f"{path.parent.name}/{session_id_from_path(path)[:8]}"
+    return key or "?"
+
+def format_tokens(count):
+    """Numero di token abbreviato (1.2k, 3.4M)"""
+    for unit, size in (("G", 10**9), ("M", 10**6), ("k", 10**3)):
+        if count >= size:
+            return f"{count / size:.1f}{unit}"
+    return str(count)
+
+def format_cost(row):
+    return f"${row['cost']:.2f}" + ("+" if row['cost_partial'] else "")
+
+def format_usage_report(group_by, rows):
+    """Testo della tabella dei consumi per il report da terminale"""
+    lines = [
+        f"{'chiave':<40} {'msg':>6} {'input':>8} {'output':>8} "
+        f"{'cache W':>8} {'cache R':>8} {'costo':>10}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{usage_key_label(group_by, row['key'])[:40]:<40} {row['messages']:>6} "
+            f"{format_tokens(row['input_tokens']):>8} {format_tokens(row['output_tokens']):>8} "
+            f"{format_tokens(row['cache_creation_tokens']):>8} "
+            f"{format_tokens(row['cache_read_tokens']):>8} {format_cost(row):>10}"
+        )
+    total = sum(row['cost'] for row in rows)
+    lines.append(f"Totale stimato: ${total:.2f}"
+                 + (" (+ modelli senza prezzo)" if any(r['cost_partial'] for r in rows) else ""))
+    return "\n".join(lines)
+
+
+# ============================================================
+#                    MONITORAGGIO CARTELLE PROGETTI
+# ============================================================
+
+class ProjectsWatcher(ABC):
+    """
+    Osserva ~/.claude/projects e segnala quali progetti sono cambiati.
+
+    Il callback viene chiamato dal thread del watcher con l'insieme dei
+    nomi delle cartelle progetto toccate, oppure con None quando non è
+    possibile sapere cosa è cambiato (serve una scansione completa).
+    Le sottoclassi implementano _run, il ciclo del thread.
+    """
+
+    def __init__(self, projects_dir, callback):
+        self.projects_dir = Path(projects_dir)
+        self.callback = callback
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    @abstractmethod
+    def _run(self):
+        """Ciclo del thread: osserva la cartella finché stop_event non è impostato"""
+
+
+class InotifyWatcher(ProjectsWatcher):
+    """Watcher basato su inotify (Linux), via ctypes senza dipendenze"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    ROOT_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+    PROJECT_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_DELETE |
+                    IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF)
+
+    EVENT_HEADER = struct.Struct("iIII")
+
+    # Gli eventi che arrivano entro questo intervallo vengono raggruppati
+    DEBOUNCE = 0.2
+
+    def __init__(self, projects_dir, callback):
+        super().__init__(projects_dir, callback)
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fallita")
+        self.watches = {}
+        self.root_wd = self._add_watch(self.projects_dir, self.ROOT_MASK)
+        if self.root_wd is None:
+            os.close(self.fd)
+            raise OSError(f"impossibile osservare {self.projects_dir}")
+        for folder in scan_project_folders(self.projects_dir):
+            self._add_watch(folder, self.PROJECT_MASK)
+
+    @staticmethod
+    def is_supported():
+        return sys.platform.startswith("linux") and bool(ctypes.util.find_library("c"))
+
+    def _add_watch(self, path, mask):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(path)), mask)
+        if wd < 0:
+            return None
+        self.watches[wd] = Path(path).name
+        return wd
+
+    def _read_events(self):
+        """Legge gli eventi pronti e ritorna i progetti toccati (None = tutti)"""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if mask & self.IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            if wd == self.root_wd:
+                # Cartella progetto creata, cancellata o rinominata
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and mask & self.IN_ISDIR:
+                    self._add_watch(self.projects_dir / name, self.PROJECT_MASK)
+                changed.add(name)
+            elif wd in self.watches and (name.endswith(".jsonl") or not name):
+                changed.add(self.watches[wd])
+        return changed
+
+    def _run(self):
+        try:
+            while not self.stop_event.is_set():
+                ready, _, _ = select.select([self.fd], [], [], 0.5)
+                if not ready:
+                    continue
+                changed = self._read_events()
+                # Raggruppa la raffica di scritture di una sessione attiva
+                deadline = time.monotonic() + self.DEBOUNCE
+                while changed is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    ready, _, _ = select.select([self.fd], [], [], remaining)
+                    if ready:
+                        more = self._read_events()
+                        changed = None if more is None else changed | more
+                if changed is None or changed:
+                    self.callback(changed)
+        finally:
+            os.close(self.fd)
+
+
+class PollingWatcher(ProjectsWatcher):
+    """
+    Watcher a polling, per sistemi senza inotify (es. Windows).
+
+    Ogni giro confronta l'mtime della cartella radice e delle cartelle
+    progetto (file creati o cancellati) e quello del file di sessione più
+    recente di ogni progetto, che è quello su cui scrive una sessione attiva.
+    """
+
+    def __init__(self, projects_dir, callback, interval=1.0):
+        super().__init__(projects_dir, callback)
+        self.interval = interval
+        self.root_mtime = None
+        # {nome cartella: (mtime cartella, file più recente, mtime file)}
+        self.folders = {}
+
+    def _stat_mtime(self, path):
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def _snapshot_folder(self, folder):
+        files = scan_session_files(folder)
+        newest = max(files, key=lambda f: f[1]) if files else (None, None, None)
+        return (self._stat_mtime(folder), newest[0], newest[1])
+
+    def _poll(self):
+        changed = set()
+        root_mtime = self._stat_mtime(self.projects_dir)
+        if root_mtime != self.root_mtime:
+            self.root_mtime = root_mtime
+            current = {folder.name: folder for folder in scan_project_folders(self.projects_dir)}
+            for name in set(self.folders) - set(current):
+                del self.folders[name]
+                changed.add(name)
+            for name in set(current) - set(self.folders):
+                self.folders[name] = self._snapshot_folder(current[name])
+                changed.add(name)
+
+        for name, (dir_mtime, newest, newest_mtime) in list(self.folders.items()):
+            folder = self.projects_dir / name
+            if self._stat_mtime(folder) != dir_mtime:
+                self.folders[name] = self._snapshot_folder(folder)
+                changed.add(name)
+            elif newest and self._stat_mtime(newest) != newest_mtime:
+                self.folders[name] = (dir_mtime, newest, self._stat_mtime(newest))
+                changed.add(name)
+        return changed
+
+    def _run(self):
+        # Il primo giro costruisce solo lo stato iniziale
+        self._poll()
+        while not self.stop_event.wait(self.interval):
+            changed = self._poll()
+            if changed:
+                self.callback(changed)
+
+
+# Ogni quanto il mainloop applica gli aggiornamenti arrivati dal watcher
+WATCHER_DRAIN_MS = 250
+
+# Scansione in background: intervallo di svuotamento della coda e numero
+# massimo di messaggi gestiti per giro, per non bloccare il mainloop
+SCAN_DRAIN_MS = 50
+SCAN_DRAIN_BATCH = 200
+
+def create_projects_watcher(callback, projects_dir=None):
+    """Crea il watcher migliore disponibile (inotify, altrimenti polling)"""
+    if projects_dir is None:
+        projects_dir = get_claude_projects_dir()
+    if not Path(projects_dir).is_dir():
+        return None
+    if InotifyWatcher.is_supported():
+        try:
+            return InotifyWatcher(projects_dir, callback)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(projects_dir, callback)
+
+def format_size(size_bytes):
+    """Formatta dimensione file"""
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
+    elif size_bytes < 1024 * 1024:
+        return f"{size_bytes // 1024} KB"
+    else:
+        return f"{size_bytes // (1024*1024)} MB"
+
+def launch_claude_terminal(project_path, session_id=None, new_session=False, as_new_tab=False):
+    """
+    Lancia Claude in Windows Terminal
+
+    Args:
+        project_path: percorso del progetto
+        session_id: ID specifico della sessione (opzionale)
+        new_session: se True, avvia una NUOVA sessione (senza --resume)
+        as_new_tab: se True, apre come nuovo TAB nella finestra WT esistente
+    """
+    if not os.path.isdir(project_path):
+        return False
+
+    drive = ""
+    if len(project_path) >= 2 and project_path[1] == ':':
+        drive = project_path[0:2]
+
+    # Costruisci il comando Claude
+    if new_session:
+        # NUOVA SESSIONE - senza --resume
+        claude_cmd = "claude --dangerously-skip-permissions"
+        session_type = "NUOVA SESSIONE"
+    elif session_id:
+        # Riprendi sessione specifica
+        claude_cmd = f"claude --dangerously-skip-permissions --resume {session_id}"
+        session_type = f"Sessione: {session_id[:8]}..."
+    else:
+        # Riprendi ultima sessione (menu selezione)
+        claude_cmd = "claude --dangerously-skip-permissions --resume"
+        session_type = "RIPRENDI SESSIONE"
+
+    project_name = os.path.basename(project_path)
+
+    if sys.platform == 'win32':
+        batch_content = f'''@echo off
+chcp 65001 >nul
+{drive}
+cd "{project_path}"
+cls
+echo.
+echo ══════════════════════════════════════════════════════════════
+echo   Claude Code - {project_name}
+echo   Modalita: {session_type}
+echo   [Click destro per incollare]
+echo ══════════════════════════════════════════════════════════════
+echo.
+{claude_cmd}
+'''
+
+        temp_dir = tempfile.gettempdir()
+        # Usa nome unico per batch file per evitare conflitti con tab multipli
+        batch_filename = f"claude_launch_{project_name.replace(' ', '_')}_{id(project_path)}.bat"
+        batch_path = os.path.join(temp_dir, batch_filename)
+
+        with open(batch_path, 'w', encoding='utf-8') as f:
+            f.write(batch_content)
+
+        if as_new_tab:
+            # Apri come NUOVO TAB nella finestra Windows Terminal esistente
             # -w 0 = usa la finestra WT più recente (o creane una se non esiste)
             # new-tab = crea un nuovo tab
             # --title = titolo del tab
@@ -459,7 +3494,158 @@ echo.
             # Comportamento originale: apri nuova finestra
             subprocess.run(f'wt.exe -d "{project_path}" cmd /k "{batch_path}"', shell=True)
 
-    return True
+    return True
+
+
+# ============================================================
+#                    ISTANZA SINGOLA (MODALITÀ RESIDENTE)
+# ============================================================
+
+# Le istanze successive passano gli argomenti alla finestra già aperta ed
+# escono. 0 = un processo per avvio
+SINGLE_INSTANCE = os.environ.get("CLAUDE_LAUNCHER_SINGLE_INSTANCE", "1") != "0"
+# Con 1 la prima istanza resta in memoria: chiudere la finestra la nasconde
+# (torna al prossimo avvio del launcher, Ctrl+Q esce davvero)
+RESIDENT_MODE = os.environ.get("CLAUDE_LAUNCHER_RESIDENT", "0") == "1"
+# Ogni quanto la GUI controlla le richieste arrivate dalle altre istanze
+ACTIVATION_POLL_MS = 30
+
+def get_instance_address():
+    """Named pipe (Windows) o socket Unix dell'istanza residente, uno per utente"""
+    user = re.sub(r'\W', '_', os.environ.get("USERNAME") or os.environ.get("USER") or "user")
+    if sys.platform == 'win32':
+        return r'\\.\pipe\claude-launcher-' + user
+    return str(Path(tempfile.gettempdir()) / f"claude-launcher-{user}.sock")
+
+def _read_instance_key(path):
+    """Chiave salvata in path, None se manca o è incompleta"""
+    try:
+        with open(path, 'rb') as f:
+            key = f.read()
+    except OSError:
+        return None
+    return key if len(key) >= 32 else None
+
+def get_instance_key():
+    """
+    Chiave per autenticare le istanze (multiprocessing.connection)
+
+    Generata alla prima esecuzione in ~/.claude/launcher-instance.key,
+    leggibile solo dall'utente: il canale accetta solo processi suoi.
+    La chiave si scrive in un file temporaneo che poi prende il nome
+    definitivo solo se non esiste già: due primi avvii contemporanei non
+    leggono mai una chiave a metà e finiscono per usare la stessa.
+    """
+    path = get_claude_projects_dir().parent / "launcher-instance.key"
+    key = _read_instance_key(path)
+    if key:
+        return key
+    key = os.urandom(32)
+    tmp_path = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # mkstemp crea il file con O_EXCL e permessi 0600
+        fd, tmp_path = tempfile.mkstemp(prefix=".launcher-instance", dir=str(path.parent))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key)
+        try:
+            # Come O_EXCL sul nome definitivo, ma con il contenuto già completo
+            os.link(tmp_path, path)
+        except FileExistsError:
+            existing = _read_instance_key(path)
+            if existing:
+                return existing
+            # Chiave incompleta lasciata da una versione precedente
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except OSError:
+            # Filesystem senza hard link
+            fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(key)
+    except FileExistsError:
+        return _read_instance_key(path) or key
+    except OSError:
+        pass
+    finally:
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+    return key
+
+def forward_to_instance(argv):
+    """
+    Passa gli argomenti all'istanza residente, se c'è
+
+    Ritorna True se l'istanza li ha ricevuti (questo processo può uscire).
+    argv None controlla solo che l'istanza risponda.
+    """
+    from multiprocessing.connection import Client, AuthenticationError
+    try:
+        with Client(get_instance_address(), authkey=get_instance_key()) as conn:
+            conn.send({'argv': None if argv is None else list(argv), 'cwd': os.getcwd()})
+            return conn.recv() == 'ok'
+    except (OSError, EOFError, AuthenticationError):
+        return False
+
+class InstanceServer:
+    """
+    Ascolta le altre istanze in un thread e passa i loro messaggi a on_message
+
+    I messaggi sono dict {'argv': [...], 'cwd': ...}; on_message viene
+    chiamato dal thread, quindi deve solo accodarli per la GUI.
+    """
+
+    def __init__(self, on_message):
+        self.on_message = on_message
+        self.listener = None
+        self.stopped = False
+
+    def start(self):
+        """Ritorna False se l'indirizzo è occupato (c'è già un'altra istanza)"""
+        from multiprocessing.connection import Listener
+        address = get_instance_address()
+        key = get_instance_key()
+        try:
+            self.listener = Listener(address, authkey=key)
+        except OSError:
+            if sys.platform == 'win32' or forward_to_instance(None):
+                return False
+            # Socket rimasto da un'istanza terminata male
+            try:
+                os.unlink(address)
+                self.listener = Listener(address, authkey=key)
+            except OSError:
+                return False
+        threading.Thread(target=self.run, daemon=True).start()
+        return True
+
+    def run(self):
+        from multiprocessing.connection import AuthenticationError
+        while not self.stopped:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                return
+            try:
+                with conn:
+                    message = conn.recv()
+                    conn.send('ok')
+            except (OSError, EOFError):
+                continue
+            if isinstance(message, dict) and message.get('argv') is not None:
+                self.on_message(message)
+
+    def stop(self):
+        self.stopped = True
+        try:
+            self.listener.close()
+        except OSError:
+            pass
 
 
 # ============================================================
@@ -548,21 +3734,559 @@ class SessionChoiceDialog:
         # Focus
         btn_new.focus_set()
 
-    def choose_new(self):
-        self.result = "new"
-        self.dialog.destroy()
+    def choose_new(self):
+        self.result = "new"
+        self.dialog.destroy()
+
+    def choose_resume(self):
+        self.result = "resume"
+        self.dialog.destroy()
+
+    def cancel(self):
+        self.result = None
+        self.dialog.destroy()
+
+    def get_result(self):
+        self.dialog.wait_window()
+        return self.result
+
+
+# ============================================================
+#                    DIALOGO SCELTA SESSIONE DA RIPRENDERE
+# ============================================================
+
+class SessionPickerDialog:
+    """Dialogo per scegliere quale sessione riprendere"""
+
+    def __init__(self, parent, project_name, sessions):
+        self.result = None
+        self.sessions = sessions
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Riprendi sessione")
+        self.dialog.geometry("650x500")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+
+        # Centra rispetto al parent
+        self.dialog.update_idletasks()
+        x = parent.winfo_x() + (parent.winfo_width() - 650) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - 500) // 2
+        self.dialog.geometry(f"+{x}+{y}")
+
+        # Contenuto
+        frame = ttk.Frame(self.dialog, padding="15")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        # Titolo
+        title = ttk.Label(
+            frame,
+            text=f"📂 {project_name}",
+            font=("Segoe UI", 12, "bold")
+        )
+        title.pack(pady=(0, 5))
+
+        # Le sessioni continuate (riprese o duplicate) stanno sotto la loro punta
+        tips = [s for s in sessions if not s.get('continued_by')]
+        hidden = len(sessions) - len(tips)
+        text = f"{len(tips)} sessioni - doppio click per riprendere"
+        if hidden:
+            text += f" ({hidden} continuate: ▸ per vederle)"
+        subtitle = ttk.Label(
+            frame,
+            text=text,
+            font=("Segoe UI", 9),
+            foreground="gray"
+        )
+        subtitle.pack(pady=(0, 10))
+
+        # Lista sessioni
+        list_frame = ttk.Frame(frame)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = ("modified", "size", "messages", "summary")
+        self.tree = ttk.Treeview(list_frame, columns=columns, show="tree headings", height=10)
+
+        self.tree.column("#0", width=30, stretch=False)
+        self.tree.heading("modified", text="🕐 Ultima modifica")
+        self.tree.heading("size", text="📦 Dim.")
+        self.tree.heading("messages", text="✉ Msg")
+        self.tree.heading("summary", text="💬 Sessione")
+
+        self.tree.column("modified", width=130, anchor="center")
+        self.tree.column("size", width=70, anchor="center")
+        self.tree.column("messages", width=50, anchor="center")
+        self.tree.column("summary", width=350)
+
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Anteprima dell'ultima attività della sessione selezionata
+        preview_frame = ttk.LabelFrame(frame, text="Ultima attività", padding="5")
+        preview_frame.pack(fill=tk.X, pady=(10, 0))
+        self.preview = ttk.Label(preview_frame, text="", wraplength=600, justify=tk.LEFT)
+        self.preview.pack(fill=tk.X)
+        # Anteprime già lette e in lettura: la coda del file (e l'indice
+        # delle righe) si legge in un thread, il risultato arriva da preview_queue
+        self.previews = {}
+        self.preview_loading = set()
+        self.preview_queue = queue.Queue()
+
+        by_id = {s['id']: s for s in sessions}
+        for session in tips:
+            self.insert_session("", session)
+            for ancestor in session.get('ancestors', ()):
+                self.insert_session(session['id'], by_id[ancestor])
+
+        if tips:
+            first = tips[0]['id']
+            self.tree.selection_set(first)
+            self.tree.focus(first)
+            self.update_preview()
+
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self.update_preview())
+        self.tree.bind("<Double-1>", lambda e: self.choose_selected())
+        self.tree.bind("<Return>", lambda e: self.choose_selected())
+
+        # Bottoni
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill=tk.X, pady=(10, 0))
+
+        btn_cancel = ttk.Button(
+            btn_frame,
+            text="Annulla",
+            command=self.cancel
+        )
+        btn_cancel.pack(side=tk.LEFT)
+
+        btn_menu = ttk.Button(
+            btn_frame,
+            text="📋 Menu di Claude",
+            command=self.choose_menu
+        )
+        btn_menu.pack(side=tk.LEFT, padx=(5, 0))
+
+        btn_resume = ttk.Button(
+            btn_frame,
+            text="📂 Riprendi selezionata",
+            command=self.choose_selected
+        )
+        btn_resume.pack(side=tk.RIGHT)
+
+        btn_view = ttk.Button(
+            btn_frame,
+            text="👁 Visualizza",
+            command=self.view_selected
+        )
+        btn_view.pack(side=tk.RIGHT, padx=(0, 5))
+
+        # Bind Escape
+        self.dialog.bind("<Escape>", lambda e: self.cancel())
+
+        # Focus
+        self.tree.focus_set()
+
+    def insert_session(self, parent, session):
+        meta = session.get('meta') or {}
+        summary = session['summary'] or meta.get('first_prompt') or session['id']
+        summary = summary.replace("\n", " ")[:120]
+        if session.get('archived'):
+            summary = "🗜 " + summary
+        self.tree.insert(parent, tk.END, iid=session['id'], values=(
+            session['modified'].strftime("%d/%m/%Y %H:%M"),
+            format_size(session['size']),
+            meta.get('message_count', ""),
+            summary
+        ))
+
+    def update_preview(self):
+        """Mostra l'ultima attività della sessione selezionata (letta dalla coda del file)"""
+        selection = self.tree.selection()
+        if not selection:
+            self.preview.config(text="")
+            return
+        session_id = selection[0]
+        if session_id in self.previews:
+            self.preview.config(text=self.previews[session_id])
+            return
+        self.preview.config(text="⏳ Caricamento...")
+        if session_id in self.preview_loading:
+            return
+        if not self.preview_loading:
+            self.dialog.after(50, self.process_previews)
+        self.preview_loading.add(session_id)
+        session = next(s for s in self.sessions if s['id'] == session_id)
+        
+        def worker():
+            try:
+                lines = [("👤 " if role == 'user' else "🤖 ") + text.replace("\n", " ")
+                         for role, text in get_session_preview(session['path'])]
+                text = "\n".join(lines) or "(nessun messaggio recente)"
+            except Exception as e:
+                text = f"❌ Errore: {e}"
+            self.preview_queue.put((session_id, text))
+        
+        threading.Thread(target=worker, daemon=True).start()
+
+    def process_previews(self):
+        """Applica le anteprime arrivate dai thread (mainloop)"""
+        if not self.dialog.winfo_exists():
+            return
+        while True:
+            try:
+                session_id, text = self.preview_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.preview_loading.discard(session_id)
+            self.previews[session_id] = text
+            if self.tree.selection()[:1] == (session_id,):
+                self.preview.config(text=text)
+        if self.preview_loading:
+            self.dialog.after(50, self.process_previews)
+
+    def choose_selected(self):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        self.result = selection[0]
+        self.dialog.destroy()
+
+    def view_selected(self):
+        """Apre la trascrizione della sessione selezionata"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        session = next(s for s in self.sessions if s['id'] == selection[0])
+        TranscriptViewerDialog(self.dialog, session['id'][:8], session['path']).wait()
+        self.dialog.grab_set()
+
+    def choose_menu(self):
+        # Stringa vuota = lascia scegliere a Claude (--resume senza ID)
+        self.result = ""
+        self.dialog.destroy()
+
+    def cancel(self):
+        self.result = None
+        self.dialog.destroy()
+
+    def get_result(self):
+        self.dialog.wait_window()
+        return self.result
+
+
+# ============================================================
+#                    DIALOGO RISULTATI RICERCA
+# ============================================================
+
+class SearchResultsDialog:
+    """Dialogo con i risultati della ricerca: la sessione scelta viene ripresa"""
+
+    def __init__(self, parent, query, results, project_label):
+        self.result = None
+        self.results = {r['path']: r for r in results}
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Risultati ricerca")
+        self.dialog.geometry("750x400")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+
+        # Centra rispetto al parent
+        self.dialog.update_idletasks()
+        x = parent.winfo_x() + (parent.winfo_width() - 750) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - 400) // 2
+        self.dialog.geometry(f"+{x}+{y}")
+
+        frame = ttk.Frame(self.dialog, padding="15")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        title = ttk.Label(
+            frame,
+            text=f"🔍 {query}",
+            font=("Segoe UI", 12, "bold")
+        )
+        title.pack(pady=(0, 5))
+
+        subtitle = ttk.Label(
+            frame,
+            text=f"{len(results)} sessioni - doppio click per riprendere",
+            font=("Segoe UI", 9),
+            foreground="gray"
+        )
+        subtitle.pack(pady=(0, 10))
+
+        list_frame = ttk.Frame(frame)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = ("project", "when", "snippet")
+        self.tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=10)
+
+        self.tree.heading("project", text="📂 Progetto")
+        self.tree.heading("when", text="🕐 Data")
+        self.tree.heading("snippet", text="💬 Testo")
+
+        self.tree.column("project", width=160)
+        self.tree.column("when", width=110, anchor="center")
+        self.tree.column("snippet", width=440)
+
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        for r in results:
+            # timestamp ISO: 2025-01-31T10:20:30.000Z
+            when = (r['timestamp'] or "")[:16].replace("T", " ")
+            prefix = "👤 " if r['role'] == 'user' else "🤖 "
+            self.tree.insert("", tk.END, iid=r['path'], values=(
+                project_label(r['project']),
+                when,
+                prefix + r['snippet']
+            ))
+
+        if results:
+            first = results[0]['path']
+            self.tree.selection_set(first)
+            self.tree.focus(first)
+
+        self.tree.bind("<Double-1>", lambda e: self.choose_selected())
+        self.tree.bind("<Return>", lambda e: self.choose_selected())
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill=tk.X, pady=(10, 0))
+
+        btn_cancel = ttk.Button(
+            btn_frame,
+            text="Annulla",
+            command=self.cancel
+        )
+        btn_cancel.pack(side=tk.LEFT)
+
+        btn_resume = ttk.Button(
+            btn_frame,
+            text="📂 Riprendi selezionata",
+            command=self.choose_selected
+        )
+        btn_resume.pack(side=tk.RIGHT)
+
+        btn_view = ttk.Button(
+            btn_frame,
+            text="👁 Visualizza",
+            command=self.view_selected
+        )
+        btn_view.pack(side=tk.RIGHT, padx=(0, 5))
+
+        self.dialog.bind("<Escape>", lambda e: self.cancel())
+
+        self.tree.focus_set()
+
+    def choose_selected(self):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        self.result = self.results[selection[0]]
+        self.dialog.destroy()
+
+    def view_selected(self):
+        """Apre la trascrizione sul messaggio trovato"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        result = self.results[selection[0]]
+        TranscriptViewerDialog(self.dialog, result['session_id'][:8], result['path'],
+                               offset=result.get('offset')).wait()
+        self.dialog.grab_set()
+
+    def cancel(self):
+        self.result = None
+        self.dialog.destroy()
+
+    def get_result(self):
+        self.dialog.wait_window()
+        return self.result
+
+
+# ============================================================
+#                    VISUALIZZATORE SESSIONE
+# ============================================================
+
+class TranscriptViewerDialog:
+    """
+    Trascrizione di una sessione, a pagine
+
+    L'indice delle righe (SessionLineIndex) si aggiorna in background;
+    poi si caricano e si mostrano solo i TRANSCRIPT_PAGE_SIZE messaggi della pagina
+    corrente, così anche le sessioni da centinaia di MB si aprono subito.
+    Con offset si apre sul messaggio che contiene quel byte (es. un
+    risultato della ricerca), altrimenti sull'ultima pagina.
+    """
+
+    ROLE_PREFIX = {'user': "👤 ", 'assistant': "🤖 ", 'tool': "🔧 ", 'meta': "· "}
+
+    def __init__(self, parent, title, path, offset=None):
+        self.index = SessionLineIndex(path)
+        self.messages = array('L')
+        self.offset = offset
+        self.page = 0
+        self.target = None
+        self.queue = queue.Queue()
+        self.cancel_event = threading.Event()
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(f"Sessione - {title}")
+        self.dialog.geometry("800x600")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+
+        # Centra rispetto al parent
+        self.dialog.update_idletasks()
+        x = parent.winfo_x() + (parent.winfo_width() - 800) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - 600) // 2
+        self.dialog.geometry(f"+{x}+{y}")
+
+        frame = ttk.Frame(self.dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        # Navigazione
+        nav = ttk.Frame(frame)
+        nav.pack(fill=tk.X, pady=(0, 5))
+
+        self.btn_prev = ttk.Button(nav, text="◀", width=3, command=lambda: self.show_page(self.page - 1))
+        self.btn_prev.pack(side=tk.LEFT)
+        self.btn_next = ttk.Button(nav, text="▶", width=3, command=lambda: self.show_page(self.page + 1))
+        self.btn_next.pack(side=tk.LEFT, padx=(5, 0))
+
+        self.page_label = ttk.Label(nav, text="⏳ Indicizzazione...", foreground="gray")
+        self.page_label.pack(side=tk.LEFT, padx=10)
+
+        btn_goto = ttk.Button(nav, text="Vai", width=4, command=self.goto_message)
+        btn_goto.pack(side=tk.RIGHT)
+        self.goto_var = tk.StringVar()
+        goto_entry = ttk.Entry(nav, textvariable=self.goto_var, width=8)
+        goto_entry.pack(side=tk.RIGHT, padx=5)
+        goto_entry.bind("<Return>", lambda e: self.goto_message())
+        ttk.Label(nav, text="Messaggio n.").pack(side=tk.RIGHT)
+
+        # Testo
+        text_frame = ttk.Frame(frame)
+        text_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.text = tk.Text(text_frame, wrap=tk.WORD, font=("Segoe UI", 9), padx=8, pady=8)
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set, state=tk.DISABLED)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.text.tag_configure("header", foreground="gray", font=("Segoe UI", 8))
+        self.text.tag_configure("user", foreground="#1a5fb4")
+        self.text.tag_configure("tool", foreground="#6a6a6a", font=("Consolas", 9))
+        self.text.tag_configure("meta", foreground="gray")
+        self.text.tag_configure("target", background="#fff3b0")
+
+        self.dialog.bind("<Escape>", lambda e: self.close())
+        self.dialog.bind("<Prior>", lambda e: self.show_page(self.page - 1))
+        self.dialog.bind("<Next>", lambda e: self.show_page(self.page + 1))
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.update_buttons()
+        threading.Thread(target=self.build_index, daemon=True).start()
+        self.dialog.after(100, self.process_queue)
+
+    def build_index(self):
+        """Thread: aggiorna l'indice delle righe e sceglie quelle dei messaggi"""
+        try:
+            if self.index.update(self.cancel_event):
+                self.messages = self.index.lines(MESSAGE_LINE_TYPES)
+            self.queue.put(None)
+        except Exception as e:
+            self.queue.put(str(e))
+
+    def process_queue(self):
+        try:
+            error = self.queue.get_nowait()
+        except queue.Empty:
+            self.dialog.after(100, self.process_queue)
+            return
+        if error:
+            self.page_label.config(text=f"❌ Errore: {error}")
+            return
+        if not self.messages:
+            self.page_label.config(text="(nessun messaggio)")
+            return
+        if self.offset is not None:
+            line = self.index.line_of_offset(self.offset)
+            self.target = min(bisect.bisect_left(self.messages, line), len(self.messages) - 1)
+        else:
+            self.target = None
+        last = len(self.messages) - 1 if self.target is None else self.target
+        self.show_page(last // TRANSCRIPT_PAGE_SIZE)
+
+    def page_count(self):
+        return (len(self.messages) + TRANSCRIPT_PAGE_SIZE - 1) // TRANSCRIPT_PAGE_SIZE
+
+    def update_buttons(self):
+        pages = self.page_count()
+        self.btn_prev.config(state=tk.NORMAL if self.page > 0 else tk.DISABLED)
+        self.btn_next.config(state=tk.NORMAL if self.page < pages - 1 else tk.DISABLED)
+
+    def show_page(self, page):
+        """Legge dal file e mostra solo i messaggi della pagina"""
+        pages = self.page_count()
+        if not pages or not 0 <= page < pages:
+            return
+        self.page = page
+        start = page * TRANSCRIPT_PAGE_SIZE
+        try:
+            records = self.index.read(self.messages[start:start + TRANSCRIPT_PAGE_SIZE])
+        except SESSION_READ_ERRORS as e:
+            self.page_label.config(text=f"❌ Errore: {e}")
+            return
+
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        for number, record in enumerate(records, start + 1):
+            role, body = format_transcript_record(record)
+            timestamp = (record.get('timestamp') or "") if isinstance(record, dict) else ""
+            tags = (role, "target") if number - 1 == self.target else (role,)
+            if number - 1 == self.target:
+                self.text.mark_set("target", "end-1c")
+                self.text.mark_gravity("target", tk.LEFT)
+            self.text.insert(tk.END, f"#{number}  {timestamp[:19].replace('T', ' ')}\n", "header")
+            self.text.insert(tk.END, self.ROLE_PREFIX[role] + body + "\n\n", tags)
+        self.text.configure(state=tk.DISABLED)
+
+        if self.target is not None and start <= self.target < start + len(records):
+            self.text.see("target")
+        elif self.offset is None and page == pages - 1:
+            self.text.see(tk.END)
+
+        end = start + len(records)
+        self.page_label.config(
+            text=f"Messaggi {start + 1}-{end} di {len(self.messages)} (pagina {page + 1}/{pages})"
+        )
+        self.update_buttons()
 
-    def choose_resume(self):
-        self.result = "resume"
-        self.dialog.destroy()
+    def goto_message(self):
+        """Apre la pagina del messaggio N e lo evidenzia"""
+        try:
+            number = int(self.goto_var.get())
+        except ValueError:
+            return
+        if not self.messages:
+            return
+        self.target = min(max(number, 1), len(self.messages)) - 1
+        self.show_page(self.target // TRANSCRIPT_PAGE_SIZE)
 
-    def cancel(self):
-        self.result = None
+    def close(self):
+        self.cancel_event.set()
         self.dialog.destroy()
 
-    def get_result(self):
+    def wait(self):
         self.dialog.wait_window()
-        return self.result
 
 
 # ============================================================
@@ -748,19 +4472,224 @@ class RalphConfigDialog:
         return self.result
 
 
+# ============================================================
+#                    LISTA PROGETTI VIRTUALIZZATA
+# ============================================================
+
+class VirtualProjectList:
+    """
+    Lista progetti che materializza solo le righe visibili.
+
+    La Treeview contiene al massimo le righe che entrano nel riquadro: lo
+    scroll sposta una finestra sul ProjectModel e ridisegna solo quelle,
+    quindi costruzione, scroll e refresh non dipendono dal numero di
+    progetti. I valori formattati sono tenuti in cache per la finestra
+    visibile più OVERSCAN righe sopra e sotto.
+    """
+
+    OVERSCAN = 10
+    HEADER_HEIGHT = 25
+
+    def __init__(self, parent, columns, format_row, on_select=None, on_activate=None, height=12):
+        self.model = ProjectModel()
+        self.format_row = format_row
+        self.on_select = on_select
+        self.on_activate = on_activate
+        self.first = 0
+        self.visible_rows = height
+        self.selected = None
+        self.row_cache = {}
+
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", height=height,
+                                 selectmode="browse")
+        # Righe dello snapshot non ancora confermate dalla scansione
+        self.tree.tag_configure("stale", foreground="gray")
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.on_scrollbar)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        try:
+            self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except (ValueError, tk.TclError):
+            self.row_height = 20
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        self.tree.bind("<Double-1>", self.on_double_click)
+        self.tree.bind("<Return>", lambda e: self.activate())
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Up>", lambda e: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self.move_selection(-self.visible_rows))
+        self.tree.bind("<Next>", lambda e: self.move_selection(self.visible_rows))
+        self.tree.bind("<Home>", lambda e: self.move_selection(-len(self.model)))
+        self.tree.bind("<End>", lambda e: self.move_selection(len(self.model)))
+
+    def heading(self, column, **kwargs):
+        self.tree.heading(column, **kwargs)
+
+    def column(self, column, **kwargs):
+        self.tree.column(column, **kwargs)
+
+    def set_model(self, model):
+        """Sostituisce il modello (es. nuova scansione) e torna in cima"""
+        self.model = model
+        self.first = 0
+        self.row_cache = {}
+        self.refresh()
+
+    def invalidate(self, folder_name):
+        """Forza la riformattazione di una riga modificata sul posto"""
+        self.row_cache.pop(folder_name, None)
+
+    def invalidate_all(self):
+        self.row_cache = {}
+
+    # ---------------- rendering ----------------
+
+    def refresh(self):
+        """Ridisegna la finestra visibile (costo proporzionale alle righe visibili)"""
+        total = len(self.model)
+        self.first = max(0, min(self.first, total - self.visible_rows))
+        end = min(total, self.first + self.visible_rows)
+
+        # Cache dei valori formattati per finestra + overscan
+        cache = {}
+        for index in range(max(0, self.first - self.OVERSCAN), min(total, end + self.OVERSCAN)):
+            project = self.model[index]
+            name = project['folder_name']
+            cached = self.row_cache.get(name)
+            if cached and cached[0] is project:
+                cache[name] = cached
+            else:
+                cache[name] = (project, self.format_row(project))
+        self.row_cache = cache
+
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        for index in range(self.first, end):
+            project = self.model[index]
+            name = project['folder_name']
+            self.tree.insert("", tk.END, iid=name, values=cache[name][1],
+                             tags=("stale",) if project.get('stale') else ())
+
+        if self.selected and self.tree.exists(self.selected):
+            self.tree.selection_set(self.selected)
+            self.tree.focus(self.selected)
+
+        if total:
+            self.scrollbar.set(self.first / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    # ---------------- scroll ----------------
+
+    def scroll_to(self, first):
+        first = max(0, min(first, len(self.model) - self.visible_rows))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def scroll(self, rows):
+        self.scroll_to(self.first + rows)
+        return "break"
+
+    def on_scrollbar(self, *args):
+        """Comandi della scrollbar: moveto FRAZIONE / scroll N units|pages"""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.model)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.visible_rows
+            self.scroll(step)
+
+    def on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_resize(self, event):
+        rows = max(1, (event.height - self.HEADER_HEIGHT) // self.row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.refresh()
+
+    def see(self, folder_name):
+        """Porta in vista la riga di un progetto"""
+        index = self.model.index_of(folder_name)
+        if index is None:
+            return
+        if index < self.first:
+            self.scroll_to(index)
+        elif index >= self.first + self.visible_rows:
+            self.scroll_to(index - self.visible_rows + 1)
+
+    # ---------------- selezione ----------------
+
+    def select(self, folder_name):
+        """Seleziona un progetto (anche fuori vista) e lo porta in vista"""
+        if folder_name == self.selected:
+            return
+        self.selected = folder_name
+        self.see(folder_name)
+        if self.tree.exists(folder_name):
+            self.tree.selection_set(folder_name)
+            self.tree.focus(folder_name)
+        if self.on_select:
+            self.on_select(folder_name)
+
+    def clear_selection(self):
+        self.selected = None
+        self.tree.selection_remove(*self.tree.selection())
+        if self.on_select:
+            self.on_select(None)
+
+    def on_tree_select(self, event):
+        # Le righe uscite dalla finestra perdono la selezione della Treeview,
+        # ma il progetto resta selezionato nel modello
+        selection = self.tree.selection()
+        if selection and selection[0] != self.selected:
+            self.select(selection[0])
+
+    def move_selection(self, delta):
+        if not len(self.model):
+            return "break"
+        index = self.model.index_of(self.selected) if self.selected else None
+        if index is None:
+            index = self.first if delta > 0 else self.first + self.visible_rows - 1
+        else:
+            index += delta
+        index = max(0, min(index, len(self.model) - 1))
+        self.select(self.model[index]['folder_name'])
+        return "break"
+
+    def on_double_click(self, event):
+        if self.tree.identify_row(event.y):
+            self.activate()
+
+    def activate(self):
+        if self.selected and self.on_activate:
+            self.on_activate(self.selected)
+        return "break"
+
+
 # ============================================================
 #                    GUI PRINCIPALE
 # ============================================================
 
 class ClaudeLauncherGUI:
-    def __init__(self):
+    def __init__(self, single_instance=False, resident=False):
+        load_tk()
         self.root = tk.Tk()
         self.root.title("🚀 Claude Code Launcher v8")
         self.root.geometry("750x850")
         self.root.resizable(True, True)
         
         # Stato
-        self.projects = []
+        self.projects = ProjectModel()
         self.selected_project = None
         self.screenshots = []
         self.files = []
@@ -769,8 +4698,49 @@ class ClaudeLauncherGUI:
         self.terminal_launched = False
         self.current_project_path = None
         
+        # Watcher di ~/.claude/projects: gli aggiornamenti arrivano da un
+        # thread e vengono applicati alla Treeview dal mainloop
+        self.watcher = None
+        self.watcher_queue = queue.Queue()
+        # Indice di ricerca: un solo thread esegue le richieste di
+        # aggiornamento (scansione completa e cartelle toccate dal watcher)
+        self.search_queue = queue.Queue()
+        threading.Thread(target=self.run_search_indexer, daemon=True).start()
+        
+        # Consumi: aggiornati in background, il risultato arriva da usage_queue
+        self.usage_queue = queue.Queue()
+        self.usage_loading = False
+        # Sessioni del progetto selezionato, caricate in un thread
+        self.sessions_queue = queue.Queue()
+        self.sessions_pending = 0
+        self.archive_queue = queue.Queue()
+        
+        # Scansione in background: i progetti arrivano da un thread tramite
+        # scan_queue; ogni refresh incrementa la generazione e annulla il precedente
+        self.scan_queue = queue.Queue()
+        self.scan_generation = 0
+        self.scan_cancel = None
+        self.scan_total = 0
+        self.scan_found = 0
+        self.scan_draining = False
+        
+        # Istanza singola: le altre istanze mandano i loro argomenti qui;
+        # se residente, chiudere la finestra la nasconde soltanto
+        self.resident = resident
+        self.activation_queue = queue.Queue()
+        self.instance_server = None
+        self.pending_project = None
+        
         self.setup_ui()
+        self.project_list.set_model(self.projects)
+        self.show_projects_snapshot()
         self.load_projects()
+        self.start_watcher()
+        if single_instance:
+            self.start_instance_server()
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<Control-q>", lambda e: self.quit())
         
     def setup_ui(self):
         """Crea l'interfaccia"""
@@ -788,6 +4758,12 @@ class ClaudeLauncherGUI:
         self.notebook.add(self.tab_send, text="📤 Invia a Claude", state="disabled")
         self.setup_send_tab()
         
+        # Tab 3: Consumi (token e costi stimati)
+        self.tab_usage = ttk.Frame(self.notebook)
+        self.notebook.add(self.tab_usage, text="📊 Consumi")
+        self.setup_usage_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        
     def setup_projects_tab(self):
         """Setup tab selezione progetti"""
         frame = self.tab_projects
@@ -808,32 +4784,46 @@ class ClaudeLauncherGUI:
         )
         subtitle.pack(pady=(0, 15))
         
+        # Ricerca nel testo di tutte le sessioni
+        search_frame = ttk.Frame(frame)
+        search_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        ttk.Label(search_frame, text="🔍 Cerca nelle sessioni:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        search_entry.bind("<Return>", lambda e: self.search_sessions())
+        
+        btn_search = ttk.Button(
+            search_frame,
+            text="Cerca",
+            command=self.search_sessions
+        )
+        btn_search.pack(side=tk.LEFT)
+        
         # Lista progetti
         list_frame = ttk.LabelFrame(frame, text="Progetti disponibili", padding="10")
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         
-        # Treeview per progetti
+        # Lista virtualizzata: solo le righe visibili esistono nella Treeview
         columns = ("path", "sessions", "last_modified")
-        self.tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=12)
-        
-        self.tree.heading("path", text="📂 Percorso")
-        self.tree.heading("sessions", text="📊 Sessioni")
-        self.tree.heading("last_modified", text="🕐 Ultima modifica")
-        
-        self.tree.column("path", width=350)
-        self.tree.column("sessions", width=80, anchor="center")
-        self.tree.column("last_modified", width=150, anchor="center")
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.project_list = VirtualProjectList(
+            list_frame,
+            columns,
+            format_row=self.project_row_values,
+            on_select=self.on_project_select,
+            on_activate=self.on_project_double_click,
+            height=12
+        )
+        self.project_list.model = self.projects
         
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.project_list.heading("path", text="📂 Percorso")
+        self.project_list.heading("sessions", text="📊 Sessioni")
+        self.project_list.heading("last_modified", text="🕐 Ultima modifica")
         
-        # Bind selezione
-        self.tree.bind("<<TreeviewSelect>>", self.on_project_select)
-        self.tree.bind("<Double-1>", self.on_project_double_click)
+        self.project_list.column("path", width=350)
+        self.project_list.column("sessions", width=80, anchor="center")
+        self.project_list.column("last_modified", width=150, anchor="center")
         
         # Bottoni principali
         btn_frame = ttk.Frame(frame)
@@ -870,11 +4860,76 @@ class ClaudeLauncherGUI:
         )
         btn_new.pack(side=tk.LEFT, padx=(5, 0))
         
+        # Menu contestuale (click destro sulla lista)
+        self.projects_menu = tk.Menu(self.root, tearoff=0)
+        self.projects_menu.add_command(
+            label="🔁 Riprova percorso",
+            command=self.retry_selected_path
+        )
+        self.projects_menu.add_command(
+            label="🔁 Riprova tutti i percorsi non trovati",
+            command=self.retry_all_paths
+        )
+        self.projects_menu.add_separator()
+        self.projects_menu.add_command(
+            label="🗜 Archivia sessioni vecchie...",
+            command=self.archive_sessions
+        )
+        self.project_list.tree.bind("<Button-3>", self.show_projects_menu)
+        
         # Status
         self.status_projects = tk.StringVar(value="Caricamento progetti...")
         status = ttk.Label(frame, textvariable=self.status_projects, foreground="gray")
         status.pack(pady=(0, 10))
         
+    def setup_usage_tab(self):
+        """Setup tab consumi: token e costi stimati per sessione/progetto/modello/giorno"""
+        frame = self.tab_usage
+        
+        top = ttk.Frame(frame)
+        top.pack(fill=tk.X, padx=10, pady=10)
+        
+        ttk.Label(top, text="Raggruppa per:").pack(side=tk.LEFT)
+        self.usage_group = tk.StringVar(value="project")
+        group_combo = ttk.Combobox(
+            top,
+            textvariable=self.usage_group,
+            values=list(USAGE_GROUPS),
+            state="readonly",
+            width=10
+        )
+        group_combo.pack(side=tk.LEFT, padx=5)
+        group_combo.bind("<<ComboboxSelected>>", lambda e: self.show_usage())
+        
+        btn_refresh = ttk.Button(
+            top,
+            text="🔄 Aggiorna",
+            command=self.refresh_usage
+        )
+        btn_refresh.pack(side=tk.RIGHT)
+        
+        list_frame = ttk.Frame(frame)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        
+        columns = ("key", "messages", "input", "output", "cache_write", "cache_read", "cost")
+        self.usage_tree = ttk.Treeview(list_frame, columns=columns, show="headings")
+        for column, text, width in (
+            ("key", "Chiave", 220), ("messages", "Msg", 60), ("input", "Input", 70),
+            ("output", "Output", 70), ("cache_write", "Cache W", 70),
+            ("cache_read", "Cache R", 70), ("cost", "Costo stim.", 90),
+        ):
+            self.usage_tree.heading(column, text=text)
+            self.usage_tree.column(column, width=width, anchor="w" if column == "key" else "e")
+        
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.usage_tree.yview)
+        self.usage_tree.configure(yscrollcommand=scrollbar.set)
+        self.usage_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.status_usage = tk.StringVar(value="")
+        status = ttk.Label(frame, textvariable=self.status_usage, foreground="gray")
+        status.pack(pady=10)
+        
     def setup_send_tab(self):
         """Setup tab per inviare screenshot e file a Claude"""
         frame = self.tab_send
@@ -1045,54 +5100,388 @@ class ClaudeLauncherGUI:
     #                    FUNZIONI PROGETTI
     # ============================================================
         
+    def show_projects_snapshot(self):
+        """Mostra subito l'ultimo elenco salvato, in grigio finché non è verificato"""
+        projects, saved_at = load_projects_snapshot()
+        if not projects:
+            return
+        self.projects = ProjectModel(projects)
+        self.project_list.set_model(self.projects)
+        self.status_projects.set(
+            f"🕘 Elenco del {saved_at.strftime('%d/%m/%Y %H:%M')} - aggiornamento in corso..."
+        )
+
     def load_projects(self):
-        """Carica lista progetti"""
-        # Pulisci lista
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """
+        Carica lista progetti (in background, le righe arrivano man mano)
+
+        L'elenco già mostrato resta: le righe vengono segnate come da
+        verificare (stale) e la scansione applica solo le differenze;
+        quelle che a fine scansione nessuno ha confermato spariscono.
+        """
+        # Annulla la scansione ancora in corso
+        if self.scan_cancel:
+            self.scan_cancel.set()
+        self.scan_cancel = threading.Event()
+        self.scan_generation += 1
+        self.scan_total = 0
+        self.scan_found = 0
         
-        self.projects = list_projects()
+        for project in self.projects:
+            project['stale'] = True
+        self.project_list.invalidate_all()
+        self.project_list.refresh()
         
         if not self.projects:
-            self.status_projects.set("❌ Nessun progetto trovato")
+            self.status_projects.set("⏳ Caricamento progetti...")
+        
+        threading.Thread(
+            target=self.scan_worker,
+            args=(self.scan_generation, self.scan_cancel),
+            daemon=True
+        ).start()
+        
+        if not self.scan_draining:
+            self.scan_draining = True
+            self.root.after(SCAN_DRAIN_MS, self.process_scan_queue)
+        
+    def scan_worker(self, generation, cancel_event):
+        """Thread di scansione: manda i progetti trovati alla scan_queue"""
+        try:
+            for proj in iter_projects(
+                cancel_event=cancel_event,
+                on_start=lambda total: self.scan_queue.put((generation, 'total', total))
+            ):
+                self.scan_queue.put((generation, 'project', proj))
+            self.scan_queue.put((generation, 'done', None))
+        except Exception as e:
+            self.scan_queue.put((generation, 'error', str(e)))
+        
+    def process_scan_queue(self):
+        """Inserisce nella Treeview i progetti arrivati dalla scansione"""
+        finished = False
+        handled = 0
+        changed = False
+        while handled < SCAN_DRAIN_BATCH:
+            try:
+                generation, kind, payload = self.scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.scan_generation:
+                # Risultato di una scansione annullata
+                continue
+            handled += 1
+            if kind == 'total':
+                self.scan_total = payload
+            elif kind == 'project':
+                self.scan_found += 1
+                self.reconcile_project(payload)
+                changed = True
+            elif kind == 'done':
+                finished = True
+                # Nello snapshot ma non più su disco
+                for project in [p for p in self.projects if p.get('stale')]:
+                    self.apply_project_update(project['folder_name'], None)
+                changed = True
+                self.update_projects_status()
+                save_projects_snapshot(self.projects)
+                self.start_search_indexing()
+                if self.pending_project:
+                    self.open_project(self.pending_project)
+            elif kind == 'error':
+                finished = True
+                self.status_projects.set(f"❌ Errore durante la scansione: {payload}")
+        
+        if changed:
+            self.project_list.refresh()
+        
+        if finished:
+            self.scan_cancel = None
+            self.scan_draining = False
             return
         
-        for proj in self.projects:
-            path_display = proj['real_path'] or proj['folder_name']
-            if len(str(path_display)) > 45:
-                path_display = "..." + str(path_display)[-42:]
-            
-            date_str = ""
-            if proj['last_modified']:
-                date_str = proj['last_modified'].strftime("%d/%m/%Y %H:%M")
-            
-            self.tree.insert("", tk.END, values=(
-                path_display,
-                proj['session_count'],
-                date_str
-            ), tags=(proj['folder_name'],))
+        self.status_projects.set(
+            f"⏳ Caricamento progetti... {self.scan_found} trovati "
+            f"({self.scan_total} cartelle)"
+        )
+        self.root.after(SCAN_DRAIN_MS, self.process_scan_queue)
+        
+    def reconcile_project(self, project):
+        """Applica un progetto trovato dalla scansione, solo se cambiato"""
+        name = project['folder_name']
+        old = self.projects.get(name)
+        if old and old.get('stale') and same_project_row(old, project):
+            del old['stale']
+            self.project_list.invalidate(name)
+            return
+        self.apply_project_update(name, project)
         
+    def project_row_values(self, proj):
+        """Valori di una riga della Treeview progetti"""
+        path_display = proj['real_path'] or proj['folder_name']
+        if len(str(path_display)) > 45:
+            path_display = "..." + str(path_display)[-42:]
+        if proj.get('path_unresolved'):
+            path_display = "⚠ " + str(path_display)
+        
+        date_str = ""
+        if proj['last_modified']:
+            date_str = proj['last_modified'].strftime("%d/%m/%Y %H:%M")
+        
+        return (path_display, proj['session_count'], date_str)
+        
+    def update_projects_status(self):
+        """Aggiorna il conteggio progetti/sessioni nella barra di stato"""
+        if not self.projects:
+            self.status_projects.set("❌ Nessun progetto trovato")
+            return
         total = sum(p['session_count'] for p in self.projects)
-        self.status_projects.set(f"✅ {len(self.projects)} progetti, {total} sessioni totali")
+        status = f"✅ {len(self.projects)} progetti, {total} sessioni totali"
+        if SHOW_IO_STATS:
+            status += f"  [I/O: {IO_COUNTERS}]"
+        self.status_projects.set(status)
+        
+    # ============================================================
+    #                    AGGIORNAMENTI LIVE (WATCHER)
+    # ============================================================
+    
+    def start_watcher(self):
+        """Avvia il monitoraggio di ~/.claude/projects"""
+        self.watcher = create_projects_watcher(self.on_projects_changed)
+        if self.watcher:
+            self.watcher.start()
+        self.root.after(WATCHER_DRAIN_MS, self.process_watcher_queue)
+        
+    def on_projects_changed(self, folder_names):
+        """Callback del watcher (thread in background): riscansiona solo i progetti toccati"""
+        if folder_names is None:
+            self.watcher_queue.put(None)
+            return
+        projects_dir = get_claude_projects_dir()
+        # Listing aggiornati: un progetto nuovo può stare in una cartella appena creata
+        get_path_resolver().clear()
+        for name in folder_names:
+            self.watcher_queue.put((name, scan_project_folder(projects_dir / name, get_session_index())))
+        get_path_mapping_store().flush()
+        self.search_queue.put((folder_names, None))
+        
+    def process_watcher_queue(self):
+        """Applica alla Treeview gli aggiornamenti arrivati dal watcher"""
+        full_rescan = False
+        updates = {}
+        while True:
+            try:
+                item = self.watcher_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                full_rescan = True
+            else:
+                updates[item[0]] = item[1]
+        
+        if full_rescan:
+            self.load_projects()
+        elif updates:
+            for name, project in updates.items():
+                self.apply_project_update(name, project)
+            self.project_list.refresh()
+            self.update_projects_status()
+        
+        self.root.after(WATCHER_DRAIN_MS, self.process_watcher_queue)
+        
+    def apply_project_update(self, folder_name, project):
+        """
+        Aggiorna, sposta o rimuove un progetto nel modello
+
+        La lista visibile va ridisegnata dopo con project_list.refresh(),
+        una volta per gruppo di aggiornamenti.
+        """
+        if project is None:
+            self.projects.remove(folder_name)
+            if self.project_list.selected == folder_name:
+                self.project_list.clear_selection()
+            return
+        
+        old = self.projects.get(folder_name)
+        self.projects.upsert(project)
+        if old and self.selected_project is old:
+            self.selected_project = project
         
-    def on_project_select(self, event):
+    def on_project_select(self, folder_name):
         """Quando si seleziona un progetto"""
-        selection = self.tree.selection()
-        if selection:
+        project = self.projects.get(folder_name) if folder_name else None
+        if project:
             self.btn_launch.config(state=tk.NORMAL)
             # Abilita "Nuovo Tab" solo se c'è già un terminale aperto
             if self.terminal_launched:
                 self.btn_add_tab.config(state=tk.NORMAL)
             else:
                 self.btn_add_tab.config(state=tk.DISABLED)
-            idx = self.tree.index(selection[0])
-            self.selected_project = self.projects[idx]
+            self.selected_project = project
+            # Le sessioni si caricano solo per il progetto selezionato, in un thread
+            self.load_sessions_async(project)
         else:
             self.btn_launch.config(state=tk.DISABLED)
             self.btn_add_tab.config(state=tk.DISABLED)
             self.selected_project = None
 
-    def on_project_double_click(self, event):
+    def load_sessions_async(self, project):
+        """Carica le sessioni in background; il risultato arriva da sessions_queue"""
+        def worker():
+            try:
+                self.sessions_queue.put((project, self.get_project_sessions(project), None))
+            except Exception as e:
+                self.sessions_queue.put((project, [], str(e)))
+        
+        self.status_projects.set("⏳ Caricamento sessioni...")
+        self.sessions_pending += 1
+        threading.Thread(target=worker, daemon=True).start()
+        if self.sessions_pending == 1:
+            self.root.after(SCAN_DRAIN_MS, self.process_sessions_queue)
+        
+    def process_sessions_queue(self):
+        """Aggiorna riga e stato dei progetti di cui sono arrivate le sessioni"""
+        while True:
+            try:
+                project, sessions, error = self.sessions_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.sessions_pending -= 1
+            if self.projects.get(project['folder_name']) is not project:
+                # Progetto sostituito o rimosso nel frattempo
+                continue
+            self.update_project_row(project)
+            if project is not self.selected_project:
+                continue
+            if error:
+                self.status_projects.set(f"❌ Errore: {error}")
+            elif sessions:
+                last = sessions[0]
+                self.status_projects.set(
+                    f"📂 {len(sessions)} sessioni - ultima: {last['summary'] or last['id'][:8]}"
+                )
+            else:
+                self.update_projects_status()
+        if self.sessions_pending:
+            self.root.after(SCAN_DRAIN_MS, self.process_sessions_queue)
+        
+    def get_project_sessions(self, project):
+        """Sessioni del progetto (caricate su richiesta, poi dalla cache)"""
+        return load_project_sessions(project, get_session_index())
+        
+    def wait_project_sessions(self, project):
+        """
+        Sessioni del progetto per un dialogo: le carica in un thread e
+        intanto la GUI continua a rispondere (wait_variable)
+        """
+        results = queue.Queue()
+        done = tk.BooleanVar(value=False)
+        
+        def worker():
+            try:
+                results.put(self.get_project_sessions(project))
+            except Exception:
+                results.put([])
+        
+        def poll():
+            if results.empty():
+                self.root.after(SCAN_DRAIN_MS, poll)
+            else:
+                done.set(True)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
+        if not done.get():
+            self.root.wait_variable(done)
+        return results.get()
+
+    def update_project_row(self, project):
+        """Aggiorna la riga di un progetto modificato sul posto (es. sessioni caricate)"""
+        self.projects.upsert(project)
+        self.project_list.invalidate(project['folder_name'])
+        self.project_list.refresh()
+
+    def pick_session(self, project, project_name):
+        """
+        Mostra la scelta della sessione da riprendere
+
+        Ritorna l'ID della sessione, "" per il menu di Claude, None se annullato.
+        """
+        if not project:
+            return ""
+        sessions = self.wait_project_sessions(project)
+        if not sessions:
+            return ""
+        dialog = SessionPickerDialog(self.root, project_name, sessions)
+        return dialog.get_result()
+
+    def show_projects_menu(self, event):
+        """Menu contestuale sulla lista progetti"""
+        row = self.project_list.tree.identify_row(event.y)
+        if row:
+            self.project_list.select(row)
+        self.projects_menu.tk_popup(event.x_root, event.y_root)
+
+    def retry_paths(self, folder_names):
+        """Svuota la cache negativa e riprova subito a risolvere i percorsi (in background)"""
+        unresolved = get_unresolved_cache()
+        for name in folder_names:
+            unresolved.retry(name)
+        self.status_projects.set(f"🔁 Nuovo tentativo per {len(folder_names)} percorsi...")
+        threading.Thread(
+            target=self.on_projects_changed,
+            args=(set(folder_names),),
+            daemon=True
+        ).start()
+
+    def retry_selected_path(self):
+        """Riprova ora il percorso del progetto selezionato"""
+        if self.selected_project:
+            self.retry_paths([self.selected_project['folder_name']])
+
+    def retry_all_paths(self):
+        """Riprova ora tutti i percorsi non risolti"""
+        folder_names = [p['folder_name'] for p in self.projects if p.get('path_unresolved')]
+        if folder_names:
+            self.retry_paths(folder_names)
+
+    def archive_sessions(self):
+        """Comprime nell'archivio le sessioni non usate da un certo numero di giorni"""
+        days = simpledialog.askinteger(
+            "Archivia sessioni",
+            "Archivia le sessioni non modificate da quanti giorni?\n"
+            "(restano consultabili e vengono ripristinate quando le riprendi)",
+            initialvalue=ARCHIVE_AFTER_DAYS,
+            minvalue=1,
+            parent=self.root
+        )
+        if not days:
+            return
+        self.status_projects.set("🗜 Archiviazione sessioni in corso...")
+        
+        def worker():
+            result = archive_old_sessions(days)
+            self.archive_queue.put(result)
+            # Riscansione completa con le sessioni spostate nell'archivio
+            self.watcher_queue.put(None)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(SCAN_DRAIN_MS, self.process_archive_queue)
+        
+    def process_archive_queue(self):
+        try:
+            count, original, compressed = self.archive_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(SCAN_DRAIN_MS, self.process_archive_queue)
+            return
+        messagebox.showinfo(
+            "Archivio",
+            f"{count} sessioni archiviate\n"
+            f"{format_size(original)} → {format_size(compressed)}",
+            parent=self.root
+        )
+        
+    def on_project_double_click(self, folder_name):
         """Doppio click = avvia"""
         self.launch_selected()
 
@@ -1112,7 +5501,10 @@ class ClaudeLauncherGUI:
         path = self.selected_project['real_path']
 
         if not path or not os.path.isdir(path):
-            path = self.ask_path_dialog(self.selected_project['folder_name'])
+            path = self.ask_path_dialog(
+                self.selected_project['folder_name'],
+                self.selected_project.get('path_candidates')
+            )
             if not path:
                 return
 
@@ -1124,9 +5516,19 @@ class ClaudeLauncherGUI:
         if choice is None:
             return
 
-        # Lancia come NUOVO TAB
         new_session = (choice == "new")
-        success = launch_claude_terminal(path, new_session=new_session, as_new_tab=True)
+        session_id = None
+        if not new_session:
+            session_id = self.pick_session(self.selected_project, project_name)
+            if session_id is None:
+                return
+            if session_id and not self.prepare_resume(self.selected_project['folder_name'], session_id):
+                return
+
+        # Lancia come NUOVO TAB
+        success = launch_claude_terminal(
+            path, session_id=session_id or None, new_session=new_session, as_new_tab=True
+        )
 
         if success:
             mode = "🆕 Nuova" if new_session else "📂 Riprendi"
@@ -1134,6 +5536,172 @@ class ClaudeLauncherGUI:
         else:
             messagebox.showerror("Errore", f"Impossibile aggiungere tab per:\n{path}")
         
+    # ============================================================
+    #                    RICERCA
+    # ============================================================
+    
+    def start_search_indexing(self):
+        """Aggiorna l'indice di ricerca in background (solo le righe nuove)"""
+        self.search_queue.put((None, self.scan_cancel))
+        
+    def run_search_indexer(self):
+        """
+        Thread dell'indice di ricerca: esegue le richieste di search_queue
+
+        Ogni richiesta è (cartelle o None = tutte, evento di annullamento).
+        Le richieste arrivate durante un aggiornamento si uniscono in uno
+        solo: il watcher non resta mai in attesa dell'indicizzazione.
+        """
+        while True:
+            folder_names, cancel_event = self.search_queue.get()
+            folders = None if folder_names is None else set(folder_names)
+            while True:
+                try:
+                    names, event = self.search_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if names is None:
+                    folders, cancel_event = None, event
+                elif folders is not None:
+                    folders.update(names)
+            try:
+                get_search_index().update(folders, cancel_event)
+            except Exception:
+                # Un errore di lettura non deve fermare il thread
+                pass
+        
+    def search_label(self, folder_name):
+        """Nome leggibile di un progetto nei risultati di ricerca"""
+        project = self.projects.get(folder_name)
+        path = project['real_path'] if project else None
+        return os.path.basename(path) if path else folder_name
+        
+    def search_sessions(self):
+        """Cerca nel testo delle sessioni e riprende quella scelta"""
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        results = get_search_index().search(query)
+        if not results:
+            self.status_projects.set(f"🔍 Nessuna sessione contiene: {query}")
+            return
+        
+        dialog = SearchResultsDialog(self.root, query, results, self.search_label)
+        chosen = dialog.get_result()
+        if chosen:
+            self.resume_session(chosen['project'], chosen['session_id'])
+            
+    # ============================================================
+    #                    CONSUMI
+    # ============================================================
+    
+    def on_tab_changed(self, event=None):
+        """Aprendo il tab consumi li aggiorna (solo le sessioni cambiate)"""
+        if self.notebook.select() == str(self.tab_usage):
+            self.refresh_usage()
+            
+    def refresh_usage(self):
+        """Aggiorna i consumi in background e poi li mostra"""
+        if self.usage_loading:
+            return
+        self.usage_loading = True
+        self.status_usage.set("⏳ Aggiornamento consumi...")
+        
+        def worker():
+            try:
+                update_usage()
+                self.usage_queue.put(None)
+            except Exception as e:
+                self.usage_queue.put(str(e))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(SCAN_DRAIN_MS, self.process_usage_queue)
+        
+    def process_usage_queue(self):
+        try:
+            error = self.usage_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(SCAN_DRAIN_MS, self.process_usage_queue)
+            return
+        self.usage_loading = False
+        if error:
+            self.status_usage.set(f"❌ Errore: {error}")
+        else:
+            self.show_usage()
+            
+    def show_usage(self):
+        """Riempie la tabella dei consumi dagli aggregati salvati"""
+        group_by = self.usage_group.get()
+        rows = usage_report(group_by)
+        self.usage_tree.delete(*self.usage_tree.get_children())
+        for row in rows:
+            if group_by == 'project':
+                label = self.search_label(row['key'])
+            else:
+                label = usage_key_label(group_by, row['key'])
+            self.usage_tree.insert("", tk.END, values=(
+                label,
+                row['messages'],
+                format_tokens(row['input_tokens']),
+                format_tokens(row['output_tokens']),
+                format_tokens(row['cache_creation_tokens']),
+                format_tokens(row['cache_read_tokens']),
+                format_cost(row)
+            ))
+        total = sum(row['cost'] for row in rows)
+        self.status_usage.set(f"✅ {len(rows)} righe - totale stimato ${total:.2f}")
+        
+    def resume_session(self, folder_name, session_id):
+        """Riprende una sessione precisa di un progetto"""
+        project = self.projects.get(folder_name)
+        path = project['real_path'] if project else None
+        if not path or not os.path.isdir(path):
+            path = self.ask_path_dialog(
+                folder_name,
+                project.get('path_candidates') if project else None
+            )
+            if not path:
+                return
+        
+        if not self.prepare_resume(folder_name, session_id):
+            return
+        
+        project_name = os.path.basename(path)
+        self.current_project_path = path
+        if launch_claude_terminal(path, session_id=session_id):
+            self.on_terminal_launched(project_name, new_session=False)
+        else:
+            messagebox.showerror("Errore", f"Impossibile avviare Claude in:\n{path}")
+            
+    def prepare_resume(self, folder_name, session_id):
+        """Se la sessione è archiviata la decomprime al suo posto prima di riprenderla"""
+        if restore_for_resume(folder_name, session_id):
+            return True
+        messagebox.showerror(
+            "Errore",
+            f"Impossibile ripristinare la sessione archiviata:\n{session_id}"
+        )
+        return False
+        
+    def on_terminal_launched(self, project_name, new_session):
+        """Abilita il tab di invio dopo l'avvio del terminale"""
+        self.terminal_launched = True
+
+        # Abilita tab send
+        self.notebook.tab(1, state="normal")
+        self.notebook.select(1)
+
+        # Aggiorna label
+        mode = "🆕 Nuova" if new_session else "📂 Riprendi"
+        self.project_label.config(text=f"📂 {project_name} ({mode})")
+        self.status_send.set("✅ Terminale avviato! Aggiungi screenshot/file e copia")
+
+        # Abilita bottone Ralph
+        self.btn_ralph.config(state=tk.NORMAL)
+
+        # Abilita bottone "Nuovo Tab" per aggiungere altri progetti
+        self.btn_add_tab.config(state=tk.NORMAL)
+        
     def launch_selected(self):
         """Avvia il progetto selezionato - MOSTRA DIALOGO SCELTA"""
         if not self.selected_project:
@@ -1143,7 +5711,10 @@ class ClaudeLauncherGUI:
         
         if not path or not os.path.isdir(path):
             # Chiedi il percorso
-            path = self.ask_path_dialog(self.selected_project['folder_name'])
+            path = self.ask_path_dialog(
+                self.selected_project['folder_name'],
+                self.selected_project.get('path_candidates')
+            )
             if not path:
                 return
         
@@ -1156,37 +5727,34 @@ class ClaudeLauncherGUI:
             # Annullato
             return
         
+        new_session = (choice == "new")
+        session_id = None
+        if not new_session:
+            session_id = self.pick_session(self.selected_project, project_name)
+            if session_id is None:
+                return
+            if session_id and not self.prepare_resume(self.selected_project['folder_name'], session_id):
+                return
+        
         self.current_project_path = path
         
         # Lancia terminale con la scelta appropriata
-        new_session = (choice == "new")
-        success = launch_claude_terminal(path, new_session=new_session)
+        success = launch_claude_terminal(path, session_id=session_id or None, new_session=new_session)
         
         if success:
-            self.terminal_launched = True
-
-            # Abilita tab send
-            self.notebook.tab(1, state="normal")
-            self.notebook.select(1)
-
-            # Aggiorna label
-            mode = "🆕 Nuova" if new_session else "📂 Riprendi"
-            self.project_label.config(text=f"📂 {project_name} ({mode})")
-            self.status_send.set("✅ Terminale avviato! Aggiungi screenshot/file e copia")
-
-            # Abilita bottone Ralph
-            self.btn_ralph.config(state=tk.NORMAL)
-
-            # Abilita bottone "Nuovo Tab" per aggiungere altri progetti
-            self.btn_add_tab.config(state=tk.NORMAL)
+            self.on_terminal_launched(project_name, new_session)
         else:
             messagebox.showerror("Errore", f"Impossibile avviare Claude in:\n{path}")
             
-    def ask_path_dialog(self, folder_name):
-        """Dialog per chiedere il percorso"""
+    def ask_path_dialog(self, folder_name, candidates=None):
+        """Dialog per chiedere il percorso (con i candidati se il nome è ambiguo)"""
+        prompt = f"Inserisci il percorso per:\n{folder_name}"
+        if candidates:
+            prompt += "\n\nPercorsi possibili:\n" + "\n".join(candidates)
         path = simpledialog.askstring(
             "Percorso mancante",
-            f"Inserisci il percorso per:\n{folder_name}",
+            prompt,
+            initialvalue=candidates[0] if candidates else None,
             parent=self.root
         )
         if path and os.path.isdir(path):
@@ -1238,12 +5806,14 @@ class ClaudeLauncherGUI:
         if self.notebook.index(self.notebook.select()) != 1:
             return
             
-        if not PIL_AVAILABLE:
+        pil = load_pil() if PIL_AVAILABLE else None
+        if pil is None:
             messagebox.showerror(
                 "Errore",
                 "Pillow non installato!\n\nEsegui: pip install Pillow"
             )
             return
+        Image, ImageTk, ImageGrab = pil
         
         try:
             img = ImageGrab.grabclipboard()
@@ -1534,11 +6104,363 @@ class ClaudeLauncherGUI:
                 "Installa con: pip install Pillow"
             )
         
+        self.root.after_idle(report_startup)
         self.root.mainloop()
 
+    # ============================================================
+    #                    ISTANZA RESIDENTE
+    # ============================================================
+    
+    def start_instance_server(self):
+        """Diventa l'istanza residente (se un'altra non lo è già)"""
+        server = InstanceServer(self.activation_queue.put)
+        if server.start():
+            self.instance_server = server
+            self.root.after(ACTIVATION_POLL_MS, self.process_activation_queue)
+        
+    def process_activation_queue(self):
+        """Applica le richieste arrivate dalle altre istanze"""
+        while True:
+            try:
+                message = self.activation_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.activate(message['argv'], message.get('cwd'))
+        self.root.after(ACTIVATION_POLL_MS, self.process_activation_queue)
+        
+    def activate(self, argv, cwd=None):
+        """Riporta in primo piano la finestra ed esegue gli argomenti ricevuti"""
+        try:
+            args = build_arg_parser().parse_args(argv)
+        except SystemExit:
+            args = None
+        if args and args.quit:
+            self.quit()
+            return
+        self.root.deiconify()
+        self.root.lift()
+        self.root.focus_force()
+        if args and args.project:
+            project = args.project
+            if cwd and os.path.isdir(os.path.join(cwd, project)):
+                project = os.path.abspath(os.path.join(cwd, project))
+            self.open_project(project)
+        
+    def open_project(self, name):
+        """
+        Seleziona un progetto per nome della cartella o percorso reale
+
+        Se non è (ancora) nell'elenco, si riprova a fine scansione.
+        """
+        self.pending_project = None
+        for project in self.projects:
+            if project_matches(project, name):
+                self.notebook.select(0)
+                self.project_list.select(project['folder_name'])
+                return
+        if self.scan_cancel:
+            self.pending_project = name
+        else:
+            self.status_projects.set(f"⚠️ Progetto non trovato: {name}")
+        
+    def on_close(self):
+        """Chiusura finestra: con l'istanza residente la nasconde, altrimenti esce"""
+        if self.instance_server and self.resident:
+            save_projects_snapshot(self.projects)
+            self.root.withdraw()
+            return
+        self.quit()
+        
+    def quit(self):
+        """Ferma watcher, scansione e istanza residente, salva l'elenco ed esce"""
+        if self.instance_server:
+            self.instance_server.stop()
+        if self.watcher:
+            self.watcher.stop()
+        if self.scan_cancel:
+            self.scan_cancel.set()
+        if self.projects:
+            save_projects_snapshot(self.projects)
+        self.root.destroy()
+
+
+# ============================================================
+#                    RIGA DI COMANDO
+# ============================================================
+
+def project_matches(project, name):
+    """True se name indica il progetto: nome della cartella o percorso reale"""
+    return (project['folder_name'] in (name, encode_project_path(name))
+            or project['real_path'] == name)
+
+def locate_project(name, index=None, folder_only=False):
+    """
+    Trova un progetto senza scansionare gli altri
+
+    name è il nome della cartella in ~/.claude/projects o il percorso del
+    progetto (anche relativo); con folder_only=True solo il nome della
+    cartella. Ritorna il dizionario di scan_project_folder o None.
+    """
+    projects_dir = get_claude_projects_dir()
+    if folder_only:
+        candidates = [name]
+    else:
+        candidates = [encode_project_path(os.path.abspath(name))]
+        if os.sep not in name and '/' not in name:
+            candidates.insert(0, name)
+    for candidate in candidates:
+        folder = projects_dir / candidate
+        if folder.is_dir():
+            project = scan_project_folder(folder, index)
+            if project:
+                get_path_mapping_store().flush()
+                return project
+    return None
+
+def project_record(project):
+    """Progetto in forma serializzabile (JSON)"""
+    return {
+        'folder_name': project['folder_name'],
+        'path': project['real_path'],
+        'path_unresolved': project['path_unresolved'],
+        'path_candidates': project['path_candidates'],
+        'session_count': project['session_count'],
+        'last_modified': (project['last_modified'].isoformat(timespec='seconds')
+                          if project['last_modified'] else None),
+    }
+
+def session_record(session):
+    """Sessione in forma serializzabile (JSON)"""
+    meta = session.get('meta') or {}
+    return {
+        'id': session['id'],
+        'path': str(session['path']),
+        'archived': session['archived'],
+        'modified': session['modified'].isoformat(timespec='seconds'),
+        'size': session['size'],
+        'messages': meta.get('message_count'),
+        'summary': session['summary'] or meta.get('first_prompt'),
+        'continued_by': session.get('continued_by'),
+    }
+
+def print_records(records, fmt, format_line):
+    """Stampa i record come JSON, JSON lines (uno per riga, subito) o testo"""
+    if fmt == 'json':
+        print(json.dumps(list(records), indent=2))
+        return
+    for record in records:
+        if fmt == 'jsonl':
+            print(json.dumps(record), flush=True)
+        else:
+            print(format_line(record))
+
+def project_argument(args):
+    """Progetto indicato sulla riga di comando: (nome, solo come cartella)"""
+    return (args.folder, True) if args.folder else (args.project, False)
+
+def project_path_or_error(args):
+    """Percorso reale del progetto indicato; None (con messaggio su stderr) se non usabile"""
+    name, folder_only = project_argument(args)
+    project = locate_project(name, folder_only=folder_only)
+    if not project:
+        print(f"Progetto non trovato: {name}", file=sys.stderr)
+        return None, None
+    path = project['real_path']
+    if not path or not os.path.isdir(path):
+        print(f"Percorso del progetto non risolto: {project['folder_name']}", file=sys.stderr)
+        for candidate in project['path_candidates']:
+            print(f"  candidato: {candidate}", file=sys.stderr)
+        return project, None
+    return project, path
+
+def cli_list(args):
+    """Progetti dal più recente; con --format jsonl e senza --limit escono man mano"""
+    def line(r):
+        return f"{r['last_modified'] or '':19}  {r['session_count']:>4}  {r['path'] or r['folder_name']}"
+    if args.format == 'jsonl' and not args.limit:
+        print_records((project_record(p) for p in iter_projects()), 'jsonl', line)
+        return 0
+    projects = list_projects()
+    if args.limit:
+        projects = projects[:args.limit]
+    print_records([project_record(p) for p in projects], args.format, line)
+    return 0
+
+def cli_sessions(args):
+    index = get_session_index()
+    name, folder_only = project_argument(args)
+    project = locate_project(name, index, folder_only)
+    if not project:
+        print(f"Progetto non trovato: {name}", file=sys.stderr)
+        return 1
+    sessions = load_project_sessions(project, index)
+    if args.limit:
+        sessions = sessions[:args.limit]
+
+    def line(r):
+        prefix = "  ↳ " if r['continued_by'] else ""
+        summary = (r['summary'] or "").replace("\n", " ")[:80]
+        return (f"{prefix}{r['id']}  {r['modified']}  {format_size(r['size']):>9}  "
+                f"{r['messages'] if r['messages'] is not None else '':>5}  {summary}")
+    print_records([session_record(s) for s in sessions], args.format, line)
+    return 0
+
+def cli_launch(args):
+    _, path = project_path_or_error(args)
+    if not path:
+        return 1
+    return 0 if launch_claude_terminal(path, new_session=True, as_new_tab=args.tab) else 1
+
+def cli_resume(args):
+    project, path = project_path_or_error(args)
+    if not path:
+        return 1
+    if args.session and not restore_for_resume(project['folder_name'], args.session):
+        print(f"Impossibile ripristinare la sessione archiviata: {args.session}", file=sys.stderr)
+        return 1
+    return 0 if launch_claude_terminal(path, session_id=args.session, as_new_tab=args.tab) else 1
+
+def cli_ralph(args):
+    _, path = project_path_or_error(args)
+    if not path:
+        return 1
+    create_ralph_files(path, goal=args.goal, src_dir=args.src_dir,
+                       test_cmd=args.test_cmd, build_cmd=args.build_cmd)
+    ok = launch_ralph_loop(path, mode=args.mode, max_iterations=args.iterations, model=args.model)
+    return 0 if ok else 1
+
+def cli_search(args):
+    search_index = get_search_index()
+    # L'indice lo tiene aggiornato la GUI: rileggere tutte le sessioni solo se richiesto
+    if args.update:
+        search_index.update()
+    results = search_index.search(" ".join(args.query), limit=args.limit or SEARCH_LIMIT)
+
+    def line(r):
+        when = (r['timestamp'] or "")[:16].replace("T", " ")
+        return f"{r['session_id']}  {when:16}  {r['project']}\n    {r['snippet']}"
+    print_records(results, args.format, line)
+    return 0
+
+CLI_COMMANDS = {
+    'list': cli_list,
+    'sessions': cli_sessions,
+    'launch': cli_launch,
+    'resume': cli_resume,
+    'ralph': cli_ralph,
+    'search': cli_search,
+}
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Claude Code Launcher")
+    parser.add_argument(
+        "--report",
+        choices=list(USAGE_GROUPS),
+        help="stampa i consumi di token e i costi stimati, senza aprire la GUI"
+    )
+    parser.add_argument(
+        "--archive",
+        type=int,
+        metavar="GIORNI",
+        help="comprime nell'archivio le sessioni non modificate da GIORNI giorni"
+    )
+    parser.add_argument(
+        "--project",
+        metavar="PROGETTO",
+        help="seleziona il progetto (percorso o nome della cartella in ~/.claude/projects)"
+    )
+    parser.add_argument(
+        "--quit",
+        action="store_true",
+        help="chiude l'istanza già aperta"
+    )
+    parser.add_argument(
+        "--new-instance",
+        action="store_true",
+        help="apre una finestra indipendente, senza usare l'istanza già aperta"
+    )
+    
+    # Sottocomandi senza GUI (non importano tkinter né Pillow)
+    commands = parser.add_subparsers(dest="command", metavar="COMANDO")
+    formats = argparse.ArgumentParser(add_help=False)
+    formats.add_argument("--format", choices=("text", "json", "jsonl"), default="text",
+                         help="formato dell'output (jsonl: un oggetto JSON per riga)")
+    formats.add_argument("--limit", type=int, help="al massimo N risultati")
+    # I nomi delle cartelle POSIX iniziano con "-": argparse li scambierebbe
+    # per opzioni, vanno passati dopo -- oppure come --folder=CARTELLA
+    target = argparse.ArgumentParser(add_help=False)
+    target.add_argument("project", nargs="?", metavar="PROGETTO",
+                        help="percorso o nome della cartella del progetto "
+                             "(se inizia con - va scritto dopo --)")
+    target.add_argument("--folder", metavar="CARTELLA",
+                        help="nome esatto della cartella in ~/.claude/projects "
+                             "(se inizia con - scrivere --folder=CARTELLA)")
+    
+    commands.add_parser("list", parents=[formats], help="elenca i progetti dal più recente")
+    
+    commands.add_parser("sessions", parents=[target, formats], help="elenca le sessioni di un progetto")
+    
+    sub = commands.add_parser("launch", parents=[target],
+                              help="avvia una nuova sessione di Claude nel progetto")
+    sub.add_argument("--tab", action="store_true", help="come nuovo tab di Windows Terminal")
+    
+    sub = commands.add_parser("resume", parents=[target],
+                              help="riprende una sessione (senza ID: menu di Claude)")
+    sub.add_argument("session", nargs="?", help="ID della sessione")
+    sub.add_argument("--tab", action="store_true", help="come nuovo tab di Windows Terminal")
+    
+    sub = commands.add_parser("ralph", parents=[target],
+                              help="avvia il loop autonomo Ralph nel progetto")
+    sub.add_argument("--goal", required=True, help="obiettivo da implementare")
+    sub.add_argument("--mode", choices=("plan", "build"), default="plan")
+    sub.add_argument("--iterations", type=int, default=5, help="iterazioni massime")
+    sub.add_argument("--model", choices=("sonnet", "opus"), default="sonnet")
+    sub.add_argument("--src-dir", default=".", help="cartella dei sorgenti")
+    sub.add_argument("--test-cmd", default="npm test")
+    sub.add_argument("--build-cmd", default="npm run build")
+    
+    sub = commands.add_parser("search", parents=[formats], help="cerca nel testo delle sessioni")
+    sub.add_argument("query", nargs="+", help="termini da cercare (tutti, anche come prefisso)")
+    sub.add_argument("--update", action="store_true",
+                     help="indicizza prima le righe nuove di tutte le sessioni "
+                          "(la prima volta può richiedere minuti)")
+    return parser
 
 def main():
-    app = ClaudeLauncherGUI()
+    parser = build_arg_parser()
+    args = parser.parse_args()
+    
+    if args.command:
+        if 'folder' in args:
+            # Con --folder l'unico posizionale di resume è l'ID della sessione
+            if args.folder and args.command == 'resume' and args.session is None:
+                args.project, args.session = None, args.project
+            if bool(args.folder) == bool(args.project):
+                parser.error("indicare il progetto oppure --folder (uno solo dei due)")
+        sys.exit(CLI_COMMANDS[args.command](args))
+    
+    if args.archive:
+        count, original, compressed = archive_old_sessions(args.archive)
+        print(f"{count} sessioni archiviate: {format_size(original)} -> {format_size(compressed)}")
+        return
+    
+    if args.report:
+        update_usage()
+        print(format_usage_report(args.report, usage_report(args.report)))
+        return
+    
+    single_instance = SINGLE_INSTANCE and not args.new_instance
+    # Con un'istanza già attiva le si passano gli argomenti e si esce
+    if single_instance and forward_to_instance(sys.argv[1:]):
+        return
+    if args.quit:
+        return
+    
+    app = ClaudeLauncherGUI(single_instance=single_instance,
+                            resident=RESIDENT_MODE and single_instance)
+    if args.project:
+        project = args.project
+        app.open_project(os.path.abspath(project) if os.path.isdir(project) else project)
     app.run()
 
 